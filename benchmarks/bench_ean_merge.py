@@ -0,0 +1,66 @@
+"""
+Benchmark do merge de EANs (src.processors.ean_merger).
+
+Gera um mestre de EANs e encartes sintéticos de tamanhos crescentes e mede o
+tempo de merge_ean_index sobre um índice construído uma única vez. O custo por linha deve permanecer
+aproximadamente constante (escala linear).
+
+Uso:
+    python -m benchmarks.bench_ean_merge
+    python -m benchmarks.bench_ean_merge --master 200000 --sizes 1000 5000 20000 80000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.processors.ean_merger import build_ean_index, merge_ean_index
+
+def make_master(n_rows, rng):
+    """Gera um mestre {código, ean} com alguns códigos repetidos e listas separadas por '/'."""
+    codes = rng.integers(100000, 100000 + n_rows // 2, size=n_rows).astype(str)
+    eans = rng.integers(7890000000000, 7899999999999, size=n_rows).astype(str)
+    multi = rng.random(n_rows) < 0.1
+    eans[multi] = [f"{e}/{int(e) + 1}" for e in eans[multi]]
+    return pd.DataFrame({'código': codes, 'ean': eans})
+
+def make_encarte(n_rows, master, rng):
+    """Gera linhas de encarte com 80% dos códigos presentes no mestre."""
+    known = rng.random(n_rows) < 0.8
+    codes = np.where(
+        known,
+        rng.choice(master['código'].to_numpy(), size=n_rows),
+        rng.integers(900000, 999999, size=n_rows).astype(str)
+    )
+    eans = rng.integers(7890000000000, 7899999999999, size=n_rows).astype(str)
+    return pd.DataFrame({'código': codes, 'ean': eans, 'descrição do item': 'PRODUTO'})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--master', type=int, default=200_000, help="Linhas do mestre de EANs")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 5_000, 20_000, 80_000], help="Linhas do encarte")
+    parser.add_argument('--repeat', type=int, default=3, help="Repetições por tamanho (usa o menor tempo)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    master = make_master(args.master, rng)
+
+    start = time.perf_counter()
+    index = build_ean_index(master)
+    index_time = time.perf_counter() - start
+    print(f"Índice do mestre ({args.master} linhas): {index_time:.3f}s")
+
+    print(f"{'linhas':>10} {'tempo (s)':>10} {'µs/linha':>10}")
+    for size in args.sizes:
+        encarte = make_encarte(size, master, rng)
+        best = float('inf')
+        for _ in range(args.repeat):
+            df = encarte.copy()
+            start = time.perf_counter()
+            merge_ean_index(df, index)
+            best = min(best, time.perf_counter() - start)
+        print(f"{size:>10} {best:>10.3f} {best / size * 1e6:>10.1f}")
+
+if __name__ == '__main__':
+    main()
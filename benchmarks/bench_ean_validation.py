@@ -0,0 +1,104 @@
+"""
+Benchmark e verificação de conformidade da validação de EANs
+(src.utils.ean_validator.validate_ean_series).
+
+Gera uma coluna "Códigos dos produtos" sintética (listas de EANs separadas por ';'
+ou '/', com dígitos verificadores errados, códigos convertidos em data e
+repetições), confere o resultado vetorial contra uma implementação linha a linha
+em Python puro e mede a vazão das duas abordagens.
+
+Uso:
+    python -m benchmarks.bench_ean_validation
+    python -m benchmarks.bench_ean_validation --tokens 1000000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+
+import pandas as pd
+
+from src.utils.ean_validator import validate_ean_series, MIN_GTIN_LENGTH, GTIN_LENGTHS, DATE_MANGLED_PATTERN
+
+def check_digit(body):
+    """Dígito verificador GTIN do corpo informado (sem o dígito)."""
+    total = sum(int(d) * (3 if i % 2 == 0 else 1) for i, d in enumerate(reversed(body)))
+    return str((10 - total % 10) % 10)
+
+def make_ean(rng):
+    """Sorteia um EAN-13 com dígito verificador correto (ou, às vezes, errado)."""
+    body = "789" + "".join(rng.choices("0123456789", k=9))
+    digit = check_digit(body)
+    if rng.random() < 0.02:
+        digit = str((int(digit) + 1) % 10)
+    return body + digit
+
+def make_column(tokens, rng):
+    """Gera linhas com 1 a 3 códigos até somar tokens códigos."""
+    pool = [make_ean(rng) for _ in range(tokens // 2)]
+    rows, count = [], 0
+    while count < tokens:
+        k = rng.choice([1, 1, 1, 2, 3])
+        codes = [rng.choice(pool) for _ in range(k)]
+        if rng.random() < 0.01:
+            codes[0] = f"{rng.randint(2000, 2030)}-{rng.randint(1, 12)}"
+        if rng.random() < 0.05:
+            codes[0] = str(rng.randint(1000, 99999))
+        rows.append(rng.choice([";", " / "]).join(codes) if rng.random() > 0.01 else None)
+        count += k
+    return pd.Series(rows, dtype=object)
+
+def reference_validation(series):
+    """Implementação linha a linha, usada como referência."""
+    date_re = re.compile(f"^{DATE_MANGLED_PATTERN}$")
+    parsed = []
+    for value in series:
+        text = "" if value is None or pd.isna(value) else str(value)
+        parsed.append([t.strip() for t in text.replace("/", ";").split(";") if t.strip()])
+
+    rows_with = {}
+    for row, tokens in enumerate(parsed):
+        for token in set(tokens):
+            rows_with[token] = rows_with.get(token, 0) + 1
+
+    flags = []
+    for tokens in parsed:
+        invalid = date = dup = False
+        for token in tokens:
+            is_date = bool(date_re.match(token))
+            date |= is_date
+            if not is_date and len(token) >= MIN_GTIN_LENGTH:
+                ok = token.isdigit() and len(token) in GTIN_LENGTHS and check_digit(token[:-1]) == token[-1]
+                invalid |= not ok
+            dup |= tokens.count(token) > 1 or rows_with[token] > 1
+        flags.append((invalid, date, dup))
+    return pd.DataFrame(flags, columns=["invalid", "date_mangled", "duplicate"], index=series.index)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=500_000, help="Quantidade de EANs na coluna")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    column = make_column(args.tokens, rng)
+
+    start = time.perf_counter()
+    expected = reference_validation(column)
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    flags, summary = validate_ean_series(column)
+    engine_time = time.perf_counter() - start
+
+    mismatches = int((flags != expected).any(axis=1).sum())
+    print(f"{args.tokens} EANs em {len(column)} linhas: {summary}")
+    print(f"{'linha a linha (Python)':<25} {reference_time:>8.3f}s {args.tokens / reference_time:>12,.0f} EANs/s")
+    print(f"{'vetorial':<25} {engine_time:>8.3f}s {args.tokens / engine_time:>12,.0f} EANs/s")
+    if mismatches:
+        print(f"❌ {mismatches} linhas divergentes em relação à referência")
+        sys.exit(1)
+    print("✅ Resultados idênticos à referência")
+
+if __name__ == '__main__':
+    main()
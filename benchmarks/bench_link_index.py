@@ -0,0 +1,76 @@
+"""
+Benchmark do carregamento do repositório de links (src.utils.link_loader).
+
+Mede, para o JSON informado:
+  - parse direto do JSON (comportamento antigo, a cada clique);
+  - compilação do índice SQLite (primeira carga, sidecar ausente);
+  - carga fria a partir do sidecar (novo processo, sidecar válido);
+  - carga quente (índice já em memória no processo).
+
+Uso:
+    python -m benchmarks.bench_link_index
+    python -m benchmarks.bench_link_index --json data/default_url.json --repeat 5
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from src.utils import link_loader
+
+def best_of(repeat, func):
+    """Executa func repeat vezes e retorna o menor tempo (s)."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--json', default='data/default_url.json', help="Repositório de links a medir")
+    parser.add_argument('--repeat', type=int, default=5, help="Repetições por medida (usa o menor tempo)")
+    args = parser.parse_args()
+
+    # Trabalha em uma cópia para não tocar no sidecar do projeto
+    work_dir = tempfile.mkdtemp()
+    try:
+        json_path = os.path.join(work_dir, os.path.basename(args.json))
+        shutil.copy2(args.json, json_path)
+        index_path = link_loader.sidecar_path(json_path)
+
+        def parse_json():
+            with open(json_path, "r", encoding="utf-8") as f:
+                link_loader.parse_links(json.load(f))
+
+        def compile_index():
+            if os.path.exists(index_path):
+                os.remove(index_path)
+            link_loader.compile_link_repository(json_path)
+
+        def cold_load():
+            link_loader._repository_cache.clear()
+            link_loader.load_link_repository(json_path)
+
+        def warm_load():
+            link_loader.load_link_repository(json_path)
+
+        results = [
+            ("parse do JSON", best_of(args.repeat, parse_json)),
+            ("compilação do índice", best_of(args.repeat, compile_index)),
+            ("carga fria (sidecar)", best_of(args.repeat, cold_load)),
+            ("carga quente (memória)", best_of(args.repeat, warm_load)),
+        ]
+        entries = len(link_loader.load_link_repository(json_path))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{args.json}: {entries} EANs")
+    for label, seconds in results:
+        print(f"{label:<25} {seconds * 1000:>10.2f} ms")
+
+if __name__ == '__main__':
+    main()
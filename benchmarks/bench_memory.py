@@ -0,0 +1,73 @@
+"""
+Benchmark de memória do esquema de tipos (src.utils.schema).
+
+Gera um encarte sintético (benchmarks.generate_encarte), prepara e filtra as linhas CRM
+e compara a memória (memory_usage(deep=True)) do DataFrame de trabalho e dos arquivos
+finais com colunas object e com o esquema compacto (categorias e strings Arrow).
+
+Uso:
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --rows 500000
+"""
+import argparse
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.generate_encarte import generate, JUNK_ROWS
+from src.config.config_loader import load_config, build_store_mapping
+from src.processors.dataframe_builder import build_final_dataframe
+from src.processors.promotion_processor import prepare_base_frame, filter_crm_rows
+from src.utils.link_loader import LinkIndex
+from src.utils.reporter import CollectingReporter
+from src.utils.schema import apply_working_schema
+from src.utils.text_utils import ProductNameCorrector, BuyerCarrosselMatcher
+
+def frame_mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+def build_outputs(df_filtered, config):
+    """Constrói os DataFrames finais de todos os perfis."""
+    _, buyer_carrossel_map, product_name_corrections, store_profiles = config
+    store_mapping = build_store_mapping(store_profiles)
+    name_corrector = ProductNameCorrector(product_name_corrections)
+    buyer_matcher = BuyerCarrosselMatcher(buyer_carrossel_map)
+    start_date, end_date = datetime(2026, 10, 1), datetime(2026, 10, 7, 23, 59)
+    partitions = dict(tuple(df_filtered.groupby("perfil de loja", sort=False, observed=True)))
+    return [
+        build_final_dataframe(
+            partitions[profile], profile, start_date, end_date, store_mapping, True,
+            LinkIndex(), buyer_matcher, name_corrector, CollectingReporter()
+        )
+        for profile in store_profiles if profile in partitions
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="Linhas do encarte sintético")
+    args = parser.parse_args()
+
+    config = load_config(CollectingReporter())
+    paths, _ = generate(args.rows, ["csv"], tempfile.mkdtemp(prefix="encarte_bench_"))
+    df_base = pd.read_csv(paths["csv"], sep=";", header=len(JUNK_ROWS))
+    df_filtered = filter_crm_rows(prepare_base_frame(df_base))
+
+    object_mb = frame_mb(df_filtered)
+    compact = apply_working_schema(df_filtered)
+    compact_mb = frame_mb(compact)
+    outputs_object_mb = sum(frame_mb(df.astype(object)) for df in build_outputs(df_filtered, config))
+    outputs_compact_mb = sum(frame_mb(df) for df in build_outputs(compact, config))
+
+    print(f"Linhas CRM: {len(df_filtered)} de {len(df_base)}")
+    print(f"{'':<24} {'object (MB)':>12} {'compacto (MB)':>14} {'redução':>9}")
+    for label, before, after in [
+        ("DataFrame de trabalho", object_mb, compact_mb),
+        ("Arquivos finais", outputs_object_mb, outputs_compact_mb),
+    ]:
+        print(f"{label:<24} {before:>12.1f} {after:>14.1f} {(1 - after / before) * 100:>8.0f}%")
+    print()
+    print(compact.dtypes.to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark e verificação de conformidade do motor de correção de nomes
+(src.utils.text_utils.ProductNameCorrector).
+
+Gera descrições sintéticas a partir dos padrões de data/config.json, confere
+que o motor compilado produz exatamente o mesmo resultado que a aplicação
+sequencial de re.sub (um padrão por vez, na ordem do dicionário) e mede a
+vazão das duas abordagens.
+
+Uso:
+    python -m benchmarks.bench_name_corrections
+    python -m benchmarks.bench_name_corrections --rows 200000 --distinct 5000
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+
+import pandas as pd
+
+from src.utils.text_utils import ProductNameCorrector
+
+FILLER_WORDS = ["500G", "1KG", "LT", "PCT", "UN", "INTEGRAL", "ZERO", "TRAD", "CX", "2L", "C/12"]
+
+def reference_correction(name, corrections_dict):
+    """Implementação sequencial original, usada como referência."""
+    if pd.isna(name):
+        return ""
+    corrected_name = str(name).strip()
+    for pattern, replacement in corrections_dict.items():
+        corrected_name = re.sub(pattern, replacement, corrected_name, flags=re.IGNORECASE)
+    return corrected_name.upper()
+
+def pattern_words(corrections_dict):
+    """Extrai o texto literal dos padrões (sem \\b) para montar nomes que os acionem."""
+    return [re.sub(r"\\[bB]", "", pattern) for pattern in corrections_dict]
+
+def make_names(corrections_dict, distinct, rows, rng):
+    """Gera rows nomes sorteados de um conjunto de distinct descrições."""
+    words = pattern_words(corrections_dict) + [r.lower() for r in corrections_dict.values()]
+    pool = []
+    for _ in range(distinct):
+        parts = rng.sample(FILLER_WORDS, 2)
+        for _ in range(rng.randint(0, 3)):
+            parts.insert(rng.randint(0, len(parts)), rng.choice(words))
+        name = " ".join(parts)
+        pool.append(name.upper() if rng.random() < 0.5 else name)
+    pool.append(None)
+    return pd.Series(rng.choices(pool, k=rows), dtype=object)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', default='data/config.json', help="Arquivo de configuração com product_name_corrections")
+    parser.add_argument('--rows', type=int, default=50_000, help="Linhas da coluna de descrição")
+    parser.add_argument('--distinct', type=int, default=3_000, help="Descrições distintas")
+    args = parser.parse_args()
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        corrections = json.load(f)["product_name_corrections"]
+
+    rng = random.Random(42)
+    names = make_names(corrections, args.distinct, args.rows, rng)
+
+    start = time.perf_counter()
+    expected = names.apply(lambda x: reference_correction(x, corrections))
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    corrector = ProductNameCorrector(corrections)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = corrector.correct_series(names)
+    engine_time = time.perf_counter() - start
+
+    mismatches = (result != expected).sum()
+    print(f"{len(corrections)} padrões, {args.rows} linhas, {names.nunique()} distintas")
+    print(f"{'sequencial (re.sub)':<25} {reference_time:>8.3f}s {args.rows / reference_time:>12,.0f} linhas/s")
+    print(f"{'motor compilado':<25} {engine_time:>8.3f}s {args.rows / engine_time:>12,.0f} linhas/s")
+    print(f"{'compilação':<25} {compile_time * 1000:>8.2f}ms")
+    if mismatches:
+        print(f"❌ {mismatches} divergências em relação à aplicação sequencial")
+        sys.exit(1)
+    print("✅ Resultados idênticos à aplicação sequencial")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark da montagem/exportação dos perfis em paralelo (pool de processos de
+src.processors.promotion_processor) contra a execução em sequência.
+
+Gera um encarte CSV sintético (benchmarks.generate_encarte) e mede process_promotions:
+  sequência   parallel_profiles=False (todos os perfis neste processo)
+  processos   parallel_profiles=True, com o pool já iniciado (o início do pool,
+              pago uma vez por servidor, é informado à parte)
+  limite      tempo em sequência menos a soma dos perfis mais o perfil mais lento,
+              medido por etapa (Instrumentation sem tracemalloc): o melhor tempo
+              possível com um processo por perfil
+
+Os arquivos das duas execuções são comparados (exceto os metadados com data/hora).
+Com uma única CPU o pool não é usado e só a sequência e o limite são medidos.
+
+Uso:
+    python -m benchmarks.bench_profile_pool
+    python -m benchmarks.bench_profile_pool --rows 60000 --repeat 3
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import date
+
+from benchmarks.generate_encarte import generate
+from src.processors import promotion_processor
+from src.processors.promotion_processor import process_promotions, profile_pool_size
+from src.utils.data_utils import encarte_period
+from src.utils.instrumentation import Instrumentation
+from src.utils.reporter import CollectingReporter
+
+# Etapas executadas por perfil (dentro do pool quando há paralelismo)
+PROFILE_STAGES = ("build", "ean_validation", "export")
+
+# Entradas do .xlsx com a data/hora da gravação, diferentes a cada execução
+VOLATILE_ENTRIES = ("docProps/core.xml",)
+
+def run(path, parallel, instrumentation=None):
+    """Processa o encarte e retorna (segundos, arquivos gerados)."""
+    start_dt, end_dt = encarte_period(date(2026, 10, 1), date(2026, 10, 7))
+    start = time.perf_counter()
+    with open(path, "rb") as uploaded_file:
+        output_files = process_promotions(
+            uploaded_file, None, None, False, start_dt, end_dt, False, False, True, None,
+            reporter=CollectingReporter(), instrumentation=instrumentation, parallel_profiles=parallel
+        )
+    return time.perf_counter() - start, output_files
+
+def workbook_entries(output):
+    """Conteúdo de cada entrada do .xlsx, sem os metadados voláteis."""
+    with zipfile.ZipFile(output) as archive:
+        return {name: archive.read(name) for name in archive.namelist() if name not in VOLATILE_ENTRIES}
+
+def same_outputs(first, second):
+    if [name for name, _ in first] != [name for name, _ in second]:
+        return False
+    return all(workbook_entries(a) == workbook_entries(b) for (_, a), (_, b) in zip(first, second))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=60_000, help="Linhas do encarte sintético")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções medidas por modo (usa a mediana)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths, _ = generate(args.rows, ["csv"], tmp)
+        path = paths["csv"]
+        workers = profile_pool_size()
+        print(f"{args.rows} linhas, {os.cpu_count()} CPUs, pool de {workers} processos")
+
+        instrumentation = Instrumentation(trace_memory=False)
+        instrumentation.start()
+        run(path, False, instrumentation)
+        instrumentation.finish()
+        per_profile = {}
+        for record in instrumentation.stages:
+            if record["stage"] in PROFILE_STAGES:
+                per_profile[record["profile"]] = per_profile.get(record["profile"], 0) + record["seconds"]
+
+        sequential = []
+        for _ in range(args.repeat):
+            seconds, sequential_files = run(path, False)
+            sequential.append(seconds)
+        sequential_time = statistics.median(sequential)
+        bound = sequential_time - sum(per_profile.values()) + max(per_profile.values())
+
+        for profile, seconds in per_profile.items():
+            print(f"  perfil {profile:<20} {seconds:>8.3f}s")
+        print(f"{'sequência':<25} {sequential_time:>8.3f}s")
+        print(f"{'limite':<25} {bound:>8.3f}s ({sequential_time / bound:.2f}x)")
+
+        if workers < 2:
+            print("Uma única CPU: os perfis rodam em sequência, sem o pool de processos")
+            return
+
+        startup, parallel_files = run(path, True)
+        parallel = []
+        for _ in range(args.repeat):
+            seconds, parallel_files = run(path, True)
+            parallel.append(seconds)
+        parallel_time = statistics.median(parallel)
+        print(f"{'processos (1ª execução)':<25} {startup:>8.3f}s")
+        print(f"{'processos':<25} {parallel_time:>8.3f}s ({sequential_time / parallel_time:.2f}x)")
+        promotion_processor.discard_profile_pool()
+
+        if not same_outputs(sequential_files, parallel_files):
+            print("❌ Arquivos diferentes entre a sequência e o pool de processos")
+            sys.exit(1)
+        print("✅ Arquivos idênticos nos dois modos")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark da inicialização da interface (main.py) e da configuração compilada.
+
+Cada medida roda em um processo novo (imports frios), com o Streamlit em modo de
+teste (streamlit.testing.v1.AppTest):
+  streamlit        import do próprio Streamlit (custo fixo, fora do nosso controle)
+  pipeline         import dos módulos de processamento, agora adiado até o primeiro uso
+  primeira página  primeira execução de main.py (tempo até a primeira exibição)
+  interação        rerun após marcar uma opção (latência da primeira interação)
+  config fria      get_app_config com compilação dos motores de nomes e carrossel
+  config quente    get_app_config reaproveitado (config.json sem mudanças)
+
+Uso:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --repeat 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+CHILD_CODE = r"""
+import json, sys, time
+start = time.perf_counter()
+import streamlit
+from streamlit.testing.v1 import AppTest
+after_streamlit = time.perf_counter()
+app = AppTest.from_file("main.py", default_timeout=120).run()
+after_first_run = time.perf_counter()
+heavy_loaded = "src.processors.promotion_processor" in sys.modules
+app.checkbox[0].check().run()
+after_interaction = time.perf_counter()
+print(json.dumps({
+    "streamlit": after_streamlit - start,
+    "primeira página": after_first_run - after_streamlit,
+    "interação": after_interaction - after_first_run,
+    "pipeline importado na primeira página": heavy_loaded,
+}))
+"""
+
+PIPELINE_CODE = r"""
+import json, time
+start = time.perf_counter()
+import src.processors.promotion_processor
+after_import = time.perf_counter()
+from src.config.config_loader import get_app_config
+from src.utils.reporter import CollectingReporter
+get_app_config(CollectingReporter())
+after_cold = time.perf_counter()
+get_app_config(CollectingReporter())
+after_warm = time.perf_counter()
+print(json.dumps({
+    "pipeline": after_import - start,
+    "config fria": after_cold - after_import,
+    "config quente": after_warm - after_cold,
+}))
+"""
+
+def run_child(code):
+    """Executa code em um processo Python novo e retorna o JSON impresso por ele."""
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Processos medidos por cenário (usa a mediana)")
+    args = parser.parse_args()
+
+    samples = {}
+    heavy_loaded = False
+    for _ in range(args.repeat):
+        for code in (CHILD_CODE, PIPELINE_CODE):
+            for label, value in run_child(code).items():
+                if isinstance(value, bool):
+                    heavy_loaded = heavy_loaded or value
+                else:
+                    samples.setdefault(label, []).append(value)
+
+    for label in ["streamlit", "pipeline", "primeira página", "interação", "config fria", "config quente"]:
+        print(f"{label:<18} {statistics.median(samples[label]) * 1000:>10.2f} ms")
+    if heavy_loaded:
+        print("❌ main.py importou os módulos de processamento antes do primeiro processamento")
+        sys.exit(1)
+    print("✅ Módulos de processamento importados só ao processar")
+
+if __name__ == "__main__":
+    main()
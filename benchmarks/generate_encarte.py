@@ -0,0 +1,150 @@
+"""
+Gerador de encartes consolidados sintéticos para benchmarks.
+
+As planilhas imitam os arquivos reais:
+  - linhas de título/lixo antes do cabeçalho;
+  - 'perfil de loja' e 'tipo ação' preenchidos só na primeira linha de cada bloco (exigem ffill);
+  - EANs convertidos em data pelo Excel, listas separadas por '/' e códigos internos curtos;
+  - preços como número, 'R$ 12,90' ou vazios (copiados da linha anterior).
+
+Também gera o mestre de EANs (CÓDIGO PRODUTO / CÓDIGO EAN) correspondente.
+
+Uso:
+    python -m benchmarks.generate_encarte --rows 1000 100000 --format xlsx csv --out-dir benchmarks/data
+"""
+import argparse
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+COLUMNS = [
+    "Perfil de Loja", "Tipo Ação", "Código", "EAN", "Descrição do Item",
+    "Preço de:", "Preço por:", "Comprador"
+]
+PROFILES = ["GERAL/PREMIUM", "GERAL", "PREMIUM"]
+ACTIONS = ["CRM", "DESTAQUE CRM", "ENCARTE", "TABLOIDE"]
+BUYERS = [
+    "Tatiane Santos", "IRLENE", "Amara", "Brenda", "Ana Paula", "Nilcelia", "Natalia",
+    "Sonia", "Neci", "Joice", "Vanessa", "Leda", "Carina", "Mariana", "Simone", "Comprador Novo"
+]
+PRODUCTS = [
+    "cafe po", "leite ferm", "desinf", "sab barra", "pao de forma", "vinho tto", "shamp",
+    "feijao", "acucar", "qjo mussarela", "file de peito", "refrig cola", "amac roupa", "arroz"
+]
+SIZES = ["500G", "1KG", "1L", "2L", "750ML", "90G", "400ML", "5KG", "C/12"]
+SUFFIXES = ["", "", "", " _sell out", " - faturamento", " sell in"]
+JUNK_ROWS = [["ENCARTE CONSOLIDADO - OFERTAS DA SEMANA"], [], ["Gerado em", "01/10/2026"]]
+
+def make_encarte(rows, seed=42):
+    """Gera o DataFrame (já no formato de linhas da planilha, sem cabeçalho) de um encarte."""
+    rng = np.random.default_rng(seed)
+
+    codes = rng.integers(100000, 100000 + max(rows, 1000), size=rows).astype(object)
+    dashed = rng.random(rows) < 0.05
+    codes[dashed] = [f"{str(c)[:4]}-{str(c)[4:]}" for c in codes[dashed]]
+
+    eans = rng.integers(7890000000000, 7899999999999, size=rows).astype(object)
+    kind = rng.random(rows)
+    multi = kind < 0.10
+    eans[multi] = [f"{e}/{e + 1}" for e in eans[multi]]
+    internal = (kind >= 0.10) & (kind < 0.15)
+    eans[internal] = rng.integers(1000, 99999, size=internal.sum())
+    as_date = (kind >= 0.15) & (kind < 0.17)
+    eans[as_date] = [datetime(2024, int(m), 1) for m in rng.integers(1, 13, size=as_date.sum())]
+    eans[(kind >= 0.17) & (kind < 0.19)] = None
+
+    names = [
+        f"{PRODUCTS[p]} {SIZES[s]}{SUFFIXES[x]}"
+        for p, s, x in zip(
+            rng.integers(0, len(PRODUCTS), rows),
+            rng.integers(0, len(SIZES), rows),
+            rng.integers(0, len(SUFFIXES), rows)
+        )
+    ]
+
+    prices = np.round(rng.uniform(2, 80, size=rows), 2)
+    price_de = prices.astype(object)
+    as_text = rng.random(rows) < 0.3
+    price_de[as_text] = [f"R$ {p:.2f}".replace(".", ",") for p in prices[as_text]]
+    price_de[rng.random(rows) < 0.08] = None
+    price_por = np.round(prices * rng.uniform(0.7, 0.95, size=rows), 2).astype(object)
+    price_por[rng.random(rows) < 0.08] = None
+
+    # Perfil e tipo de ação só na primeira linha de cada bloco
+    block_start = rng.random(rows) < 0.2
+    block_start[0] = True
+    profile = np.where(block_start, rng.choice(PROFILES, size=rows), None)
+    action = np.where(block_start, rng.choice(ACTIONS, size=rows, p=[0.5, 0.1, 0.25, 0.15]), None)
+
+    return pd.DataFrame({
+        "Perfil de Loja": profile,
+        "Tipo Ação": action,
+        "Código": codes,
+        "EAN": eans,
+        "Descrição do Item": names,
+        "Preço de:": price_de,
+        "Preço por:": price_por,
+        "Comprador": rng.choice(BUYERS, size=rows),
+    })
+
+def make_ean_master(encarte, seed=42):
+    """Gera o mestre de EANs cobrindo ~80% dos códigos do encarte, com códigos repetidos."""
+    rng = np.random.default_rng(seed + 1)
+    codes = pd.Series(encarte["Código"].unique()).astype(str).str.replace("-", "")
+    codes = codes[rng.random(len(codes)) < 0.8]
+    codes = codes.repeat(rng.integers(1, 3, size=len(codes)))
+    eans = rng.integers(7890000000000, 7899999999999, size=len(codes)).astype(str)
+    return pd.DataFrame({"CÓDIGO PRODUTO": codes.to_numpy(), "CÓDIGO EAN": eans})
+
+def write_xlsx(encarte, path):
+    """Grava a planilha com linhas de lixo antes do cabeçalho (modo write-only)."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Encarte")
+    for row in JUNK_ROWS:
+        ws.append(row)
+    ws.append(COLUMNS)
+    for row in encarte.itertuples(index=False, name=None):
+        ws.append(list(row))
+    wb.save(path)
+
+def write_csv(encarte, path):
+    """Grava o CSV (separador ';') com as mesmas linhas de lixo antes do cabeçalho."""
+    width = len(COLUMNS)
+    junk = pd.DataFrame([row + [None] * (width - len(row)) for row in JUNK_ROWS], columns=COLUMNS)
+    header = pd.DataFrame([COLUMNS], columns=COLUMNS)
+    pd.concat([junk, header, encarte], ignore_index=True).to_csv(path, sep=";", header=False, index=False)
+
+def generate(rows, formats, out_dir, seed=42):
+    """Gera encarte e mestre de EANs para um tamanho; retorna {formato: caminho} e o caminho do mestre."""
+    os.makedirs(out_dir, exist_ok=True)
+    encarte = make_encarte(rows, seed)
+    paths = {}
+    for fmt in formats:
+        path = os.path.join(out_dir, f"encarte_{rows}.{fmt}")
+        if fmt == "xlsx":
+            write_xlsx(encarte, path)
+        else:
+            write_csv(encarte, path)
+        paths[fmt] = path
+    master_path = os.path.join(out_dir, f"mestre_eans_{rows}.csv")
+    make_ean_master(encarte, seed).to_csv(master_path, sep=";", index=False)
+    return paths, master_path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="Tamanhos (linhas) a gerar")
+    parser.add_argument("--format", nargs="+", choices=["xlsx", "csv"], default=["xlsx", "csv"], help="Formatos de saída")
+    parser.add_argument("--out-dir", default=os.path.join("benchmarks", "data"), help="Diretório de saída")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        paths, master_path = generate(rows, args.format, args.out_dir, args.seed)
+        for path in list(paths.values()) + [master_path]:
+            print(f"{path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Benchmark por etapa do pipeline de encartes.
+
+Para cada tamanho e formato, gera um encarte sintético (benchmarks.generate_encarte)
+e o processa com process_promotions (mestre de EANs, links padrão e correção de nomes,
+perfis em sequência), somando o tempo de cada etapa registrada pela instrumentação
+(src.utils.instrumentation.STAGES, sem tracemalloc):
+  load_csv_stream  CSV: leitura em partes, preparação e filtro CRM parte a parte
+  load             xlsx: leitura da planilha e detecção do cabeçalho
+  prepare          xlsx: padronização, limpeza e cópia de preços (prepare_base_frame)
+  ean_merge        mesclagem com o mestre de EANs
+  filter           xlsx: ffill de perfil/tipo ação e filtro CRM (filter_crm_rows)
+  links            carregamento do repositório de links
+  transform        transformações por linha (uma vez para todos os perfis)
+  build            montagem de cada perfil
+  ean_validation   validação dos EANs de cada perfil
+  export           gravação do xlsx de cada perfil
+
+Os resultados podem ser gravados como baseline JSON e comparados em execuções
+futuras; etapas mais lentas que a tolerância são marcadas como regressão.
+
+Uso:
+    python -m benchmarks.run_benchmarks --rows 1000 10000 --save-baseline
+    python -m benchmarks.run_benchmarks --rows 1000 10000 --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import date, datetime
+from io import BytesIO
+
+import pandas as pd
+
+from benchmarks.generate_encarte import generate
+from src.processors.promotion_processor import process_promotions
+from src.utils.data_utils import encarte_period
+from src.utils.instrumentation import Instrumentation, STAGES
+from src.utils.reporter import CollectingReporter
+
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+# Diferenças absolutas abaixo disso são ruído de medição, não regressão
+MIN_REGRESSION_SECONDS = 0.01
+# Aba do encarte xlsx gerado (benchmarks.generate_encarte.write_xlsx)
+ENCARTE_SHEET = "Encarte"
+
+class NamedFile(BytesIO):
+    """Arquivo em memória com atributo name, como o UploadedFile do Streamlit."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            super().__init__(f.read())
+        self.name = os.path.basename(path)
+
+def run_pipeline(encarte_path, master_path):
+    """Executa process_promotions uma vez, retornando ({etapa: segundos}, linhas exportadas)."""
+    instrumentation = Instrumentation(trace_memory=False)
+    reporter = CollectingReporter()
+    start_date, end_date = encarte_period(date(2026, 10, 1), date(2026, 10, 7))
+    process_promotions(
+        NamedFile(encarte_path), NamedFile(master_path), None, True, start_date, end_date,
+        True, True, True, ENCARTE_SHEET,
+        reporter=reporter, instrumentation=instrumentation, parallel_profiles=False
+    )
+    if reporter.errors:
+        raise RuntimeError("; ".join(reporter.errors))
+
+    times = {}
+    rows_out = 0
+    for record in instrumentation.stages:
+        times[record["stage"]] = times.get(record["stage"], 0.0) + record["seconds"]
+        if record["stage"] == "export":
+            rows_out += record["rows_out"] or 0
+    return times, rows_out
+
+def compare(results, baseline, tolerance):
+    """Marca como regressão as etapas acima de baseline * (1 + tolerance)."""
+    reference = {(r["format"], r["rows"]): r["stages"] for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        previous = reference.get((result["format"], result["rows"]))
+        if not previous:
+            continue
+        for stage, seconds in result["stages"].items():
+            before = previous.get(stage)
+            if before and seconds > before * (1 + tolerance) and seconds - before > MIN_REGRESSION_SECONDS:
+                regressions.append(
+                    f"{result['format']} {result['rows']} linhas, {stage}: "
+                    f"{before:.3f}s → {seconds:.3f}s (+{(seconds / before - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000], help="Tamanhos (de 1k a 500k linhas)")
+    parser.add_argument("--format", nargs="+", choices=["xlsx", "csv"], default=["xlsx", "csv"], help="Formatos a medir")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições por caso (usa o menor tempo de cada etapa)")
+    parser.add_argument("--data-dir", help="Diretório dos encartes gerados (padrão: temporário)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Arquivo de baseline JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="Grava os resultados como nova baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Tolerância de regressão (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="encarte_bench_")
+
+    results = []
+    print(f"{'formato':<8} {'linhas':>8} " + " ".join(f"{stage:>15}" for stage in STAGES) + f" {'total':>10}")
+    for rows in args.rows:
+        paths, master_path = generate(rows, args.format, data_dir)
+        for fmt in args.format:
+            best = {}
+            for _ in range(args.repeat):
+                times, rows_out = run_pipeline(paths[fmt], master_path)
+                for stage, seconds in times.items():
+                    best[stage] = min(best.get(stage, float("inf")), seconds)
+            stages = {stage: round(best.get(stage, 0.0), 4) for stage in STAGES}
+            results.append({"format": fmt, "rows": rows, "rows_out": rows_out, "stages": stages})
+            print(
+                f"{fmt:<8} {rows:>8} " + " ".join(f"{stages[s]:>15.3f}" for s in STAGES)
+                + f" {sum(stages.values()):>10.3f}"
+            )
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+    exit_code = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ Regressões em relação a {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            exit_code = 1
+        else:
+            print(f"\n✅ Nenhuma regressão em relação a {args.baseline}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nBaseline gravada em {args.baseline}")
+
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Processamento em lote de encartes consolidados, sem a interface Streamlit.
+
+Exemplos:
+    python cli.py encartes/ --start 01/10/2026 --end 07/10/2026 --output-dir saida/
+    python cli.py "encartes/*.xlsx" --start 2026-10-01 --end 2026-10-07 \\
+        --ean-file mestre_eans.xlsx --default-links --name-correction --workers 4
+
+Cada encarte gera seus arquivos em <output-dir>/<nome do encarte>/ (um por perfil,
+ou um único promo_CRM.xlsx/.zip com --output-mode workbook/zip) e a execução
+grava um relatório JSON (padrão: <output-dir>/run_report.json).
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from src.utils.instrumentation import STAGES
+
+SUPPORTED_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+
+def parse_date(value):
+    """Aceita datas em DD/MM/AAAA ou AAAA-MM-DD."""
+    for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"Data inválida: {value} (use DD/MM/AAAA ou AAAA-MM-DD)")
+
+def expand_inputs(patterns):
+    """Expande diretórios e padrões glob em uma lista ordenada e sem repetições de encartes."""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            candidates = glob.glob(pattern)
+        files.extend(
+            os.path.abspath(path) for path in candidates
+            if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS)
+        )
+    return sorted(dict.fromkeys(files))
+
+def output_dir_names(files):
+    """Define um subdiretório de saída único por encarte (nome do arquivo sem extensão)."""
+    names = {}
+    used = set()
+    for path in files:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, counter = stem, 1
+        while name in used:
+            name = f"{stem} ({counter})"
+            counter += 1
+        used.add(name)
+        names[path] = name
+    return names
+
+def process_file(job):
+    """Processa um encarte (executado em um processo do pool) e retorna sua entrada do relatório."""
+    from src.processors.encarte_loader import open_workbook
+    from src.processors.promotion_processor import process_promotions, discard_profile_pool
+    from src.utils.reporter import CollectingReporter
+    from src.utils.instrumentation import Instrumentation
+
+    reporter = CollectingReporter()
+    instrumentation = None
+    if job["instrument"] or job["profile_stage"]:
+        instrumentation = Instrumentation(
+            trace_memory=job["instrument"], profile_stage=job["profile_stage"],
+            profile_dir=os.path.join(job["output_dir"], "profiles")
+        )
+    entry = {"input": job["input"], "sheet": None, "status": "error", "outputs": []}
+    start = time.perf_counter()
+    try:
+        with open(job["input"], "rb") as uploaded_file:
+            workbook = open_workbook(uploaded_file)
+            sheet_name = job["sheet"]
+            if workbook is not None and sheet_name is None:
+                sheet_name = workbook.sheet_names[0]
+            entry["sheet"] = sheet_name
+
+            ean_file = open(job["ean_file"], "rb") if job["ean_file"] else None
+            link_file = open(job["link_file"], "rb") if job["link_file"] else None
+            try:
+                output_files = process_promotions(
+                    uploaded_file, ean_file, link_file, job["default_links"],
+                    job["start"], job["end"],
+                    ean_file is not None, job["default_links"] or link_file is not None,
+                    job["name_correction"], sheet_name,
+                    workbook=workbook, reporter=reporter, instrumentation=instrumentation,
+                    use_ean_store=job["ean_store"], output_mode=job["output_mode"],
+                    parallel_profiles=job["parallel_profiles"]
+                )
+            finally:
+                for f in (ean_file, link_file):
+                    if f is not None:
+                        f.close()
+
+        os.makedirs(job["output_dir"], exist_ok=True)
+        for filename, output in output_files:
+            path = os.path.join(job["output_dir"], filename)
+            with open(path, "wb") as f:
+                f.write(output.getvalue())
+            entry["outputs"].append(path)
+
+        if reporter.errors:
+            entry["status"] = "error"
+        else:
+            entry["status"] = "ok" if output_files else "empty"
+    except Exception as e:
+        reporter.error(f"Erro durante o processamento: {e}")
+    finally:
+        # Encerra o pool de perfis, senão o processo do encarte não termina
+        discard_profile_pool(wait=True)
+    entry["seconds"] = round(time.perf_counter() - start, 3)
+    entry["messages"] = reporter.messages
+    if instrumentation is not None:
+        entry["instrumentation"] = instrumentation.to_dict()
+    return entry
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Processa encartes consolidados em lote, sem a interface Streamlit.",
+        epilog=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("inputs", nargs="*", help="Arquivos, diretórios ou padrões glob de encartes (xlsx, xls ou csv)")
+    parser.add_argument("--start", type=parse_date, help="Data de início do encarte")
+    parser.add_argument("--end", type=parse_date, help="Data de fim do encarte")
+    parser.add_argument("--output-dir", default="saida", help="Diretório dos arquivos gerados (padrão: saida)")
+    parser.add_argument("--sheet", help="Planilha a processar nos arquivos Excel (padrão: a primeira)")
+    eans = parser.add_mutually_exclusive_group()
+    eans.add_argument("--ean-file", help="Arquivo de EANs (xlsx, xls ou csv) para mesclar")
+    eans.add_argument("--ean-store", action="store_true", help="Mesclar os EANs do repositório local (data/ean_master.sqlite)")
+    parser.add_argument("--import-ean-master", help="Importa um arquivo mestre de EANs para o repositório local antes de processar")
+    links = parser.add_mutually_exclusive_group()
+    links.add_argument("--link-file", help="Arquivo JSON de links de imagens")
+    links.add_argument("--default-links", action="store_true", help="Usar o repositório de links padrão")
+    parser.add_argument("--name-correction", action="store_true", help="Aplicar correção de nomes de produtos")
+    parser.add_argument("--output-mode", choices=["files", "workbook", "zip"], default="files",
+                        help="Um arquivo por perfil (files), uma planilha com uma aba por perfil (workbook) "
+                             "ou um .zip com os arquivos dos perfis (zip) (padrão: files)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processos em paralelo (padrão: número de CPUs)")
+    parser.add_argument("--instrument", action="store_true", help="Registrar tempo, pico de memória e linhas por etapa no relatório")
+    parser.add_argument("--profile-stage", choices=STAGES,
+                        help="Gravar um dump do cProfile da etapa em <output-dir>/<encarte>/profiles/")
+    parser.add_argument("--report", help="Caminho do relatório JSON (padrão: <output-dir>/run_report.json)")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.import_ean_master:
+        from src.processors.ean_store import import_ean_master
+        with open(args.import_ean_master, "rb") as ean_master:
+            stats = import_ean_master(ean_master)
+        print(
+            f"Repositório local de EANs: {stats['inserted']} códigos novos, {stats['updated']} alterados, "
+            f"{stats['unchanged']} sem mudança, {stats['removed']} removidos ({stats['total']} no total)."
+        )
+        if not args.inputs:
+            return 0
+
+    if not args.inputs or args.start is None or args.end is None:
+        parser.error("informe os encartes, --start e --end")
+    if args.end < args.start:
+        print("A data de fim não pode ser anterior à data de início.", file=sys.stderr)
+        return 2
+
+    files = expand_inputs(args.inputs)
+    if not files:
+        print("Nenhum encarte encontrado nos caminhos informados.", file=sys.stderr)
+        return 2
+
+    from src.utils.data_utils import encarte_period
+    start_dt, end_dt = encarte_period(args.start, args.end)
+    output_root = os.path.abspath(args.output_dir)
+    dir_names = output_dir_names(files)
+    # Vários encartes já ocupam as CPUs em paralelo; com um só, os perfis são paralelizados
+    file_workers = max(1, min(args.workers or 1, len(files)))
+    jobs = [{
+        "input": path,
+        "output_dir": os.path.join(output_root, dir_names[path]),
+        "sheet": args.sheet,
+        "start": start_dt,
+        "end": end_dt,
+        "ean_file": os.path.abspath(args.ean_file) if args.ean_file else None,
+        "link_file": os.path.abspath(args.link_file) if args.link_file else None,
+        "default_links": args.default_links,
+        "name_correction": args.name_correction,
+        "ean_store": args.ean_store,
+        "output_mode": args.output_mode,
+        "parallel_profiles": file_workers == 1,
+        "instrument": args.instrument,
+        "profile_stage": args.profile_stage,
+    } for path in files]
+
+    started_at = datetime.now()
+    with ProcessPoolExecutor(max_workers=file_workers) as executor:
+        entries = []
+        for entry in executor.map(process_file, jobs):
+            print(f"[{entry['status']}] {entry['input']} ({len(entry['outputs'])} arquivo(s), {entry['seconds']}s)")
+            for message in entry["messages"]:
+                if message["level"] != "success":
+                    print(f"    {message['level']}: {message['message']}")
+            entries.append(entry)
+
+    report = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "parameters": {
+            "start": args.start.isoformat(),
+            "end": args.end.isoformat(),
+            "sheet": args.sheet,
+            "ean_file": args.ean_file,
+            "ean_store": args.ean_store,
+            "link_file": args.link_file,
+            "default_links": args.default_links,
+            "name_correction": args.name_correction,
+            "output_mode": args.output_mode,
+            "output_dir": output_root,
+        },
+        "files": entries,
+    }
+    report_path = args.report or os.path.join(output_root, "run_report.json")
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Relatório: {report_path}")
+
+    return 1 if any(entry["status"] == "error" for entry in entries) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
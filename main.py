@@ -1,15 +1,89 @@
+import json
+import uuid
 import streamlit as st
 from datetime import datetime, timedelta
-import tempfile
-from io import BytesIO
 
-from src.processors.promotion_processor import process_promotions
-from src.utils.file_utils import list_sheets
+from src.utils.reporter import StreamlitReporter
+from src.utils.job_runner import submit_job, get_job, queue_position, snapshot_upload
+
+# Os módulos de processamento (pandas, openpyxl, pyarrow...) são importados só quando
+# usados: a primeira exibição da página não espera por eles
+
+# Formatos de saída oferecidos (rótulo: modo de saída de process_promotions)
+OUTPUT_MODE_OPTIONS = {
+    "Um arquivo por perfil": "files",
+    "Uma planilha com uma aba por perfil": "workbook",
+    "Um arquivo .zip com todos os perfis": "zip",
+}
+
+# Identifica a sessão para os processamentos em segundo plano (mantido entre reruns)
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+@st.fragment(run_every=1)
+def show_job_progress(job_id):
+    """Acompanha o processamento em segundo plano; ao terminar, recarrega a página com o resultado."""
+    job = get_job(job_id, session_id)
+    if job is None or job.finished:
+        st.rerun()
+    if job.status == "queued":
+        st.progress(0.0, text=f"Aguardando na fila ({queue_position(job)} processamento(s) à frente)...")
+    elif job.reporter.cancel_requested.is_set():
+        st.progress(job.reporter.fraction, text="Cancelando...")
+    else:
+        st.progress(job.reporter.fraction, text=f"{job.reporter.stage}...")
+    if st.button("Cancelar processamento", disabled=job.reporter.cancel_requested.is_set()):
+        job.cancel()
+
+def show_job_result(job, instrumentation, incremental):
+    """Exibe as mensagens, os relatórios e os downloads de um processamento encerrado."""
+    job.reporter.replay(StreamlitReporter())
+    output_files = []
+    if job.status == "cancelled":
+        st.warning("Processamento cancelado.")
+    elif job.status == "failed":
+        st.error(f"Erro durante o processamento: {job.error}")
+    elif isinstance(job.result, tuple):
+        output_files, from_cache = job.result
+        if from_cache:
+            st.info("Mesmos arquivos e parâmetros da execução anterior: resultado reaproveitado.")
+    else:
+        output_files = job.result
+
+    if incremental is not None and incremental.last_diff and any(incremental.last_diff.values()):
+        with st.expander("🔁 Diferenças em relação à versão anterior"):
+            st.dataframe([
+                {"Situação": label, "Perfil de loja": profile, "Código": code}
+                for key, label in [("added", "Novo"), ("removed", "Removido"), ("changed", "Alterado")]
+                for profile, code in incremental.last_diff[key]
+            ])
+
+    if instrumentation is not None and instrumentation.stages:
+        with st.expander("⏱️ Tempo e memória por etapa"):
+            report = instrumentation.to_dict()
+            st.write(f"Tempo total: {report['total_seconds']} s")
+            st.dataframe(report["stages"])
+            st.download_button(
+                label="Baixar relatório JSON",
+                data=json.dumps(report, ensure_ascii=False, indent=2),
+                file_name="run_report.json",
+                mime="application/json"
+            )
+
+    if output_files:
+        from src.processors.output_bundle import output_mime_type
+        for filename, output in output_files:
+            st.download_button(
+                label=f"Baixar {filename}",
+                data=output,
+                file_name=filename,
+                mime=output_mime_type(filename)
+            )
+    elif job.status != "cancelled":
+        st.warning("Nenhum arquivo foi gerado. Verifique os dados de entrada.")
 
 st.title("Processador de Promoções CRM")
 st.write("Faça upload da planilha de promoções (xlsx, xls ou csv) e, opcionalmente, um arquivo com EANs (xlsx, xls ou csv). Selecione as datas do encarte e a planilha desejada.")
 
-temp_dir = tempfile.mkdtemp()
 default_start = datetime.today()
 default_end = datetime.today() + timedelta(days=7)
 
@@ -25,6 +99,8 @@ else:
     apply_name_correction = st.checkbox("Aplicar correção de nomes de produtos", value=False)
     use_ean_file = st.checkbox("Usar arquivo de EANs", value=False)
     use_link_file = st.checkbox("Usar arquivo JSON de Links", value=False)
+    show_instrumentation = st.checkbox("Exibir tempo e memória por etapa", value=False)
+    use_incremental = st.checkbox("Modo incremental (reaproveitar linhas de versões anteriores do encarte)", value=False)
     use_default_url = False
     link_file = None
     
@@ -39,8 +115,25 @@ else:
     uploaded_file = st.file_uploader("Selecione o arquivo de ENCARTE CONSOLIDADO", type=["xlsx", "xls", "csv"])
     
     selected_sheet = None
+    encarte_copy = None
+    workbook = None
     if uploaded_file:
-        sheet_names = list_sheets(uploaded_file)
+        # O arquivo é copiado e aberto uma vez por upload, não a cada rerun; a cópia e o
+        # workbook já aberto vão para os processamentos, que não voltam a abri-lo
+        cached_upload = st.session_state.get("encarte_upload")
+        if cached_upload is not None and cached_upload[0] == uploaded_file.file_id:
+            _, sheet_names, encarte_copy, workbook = cached_upload
+        else:
+            from src.processors.encarte_loader import open_workbook
+            from src.utils.file_utils import list_sheets
+            encarte_copy = snapshot_upload(uploaded_file)
+            try:
+                workbook = open_workbook(encarte_copy)
+            except Exception as e:
+                st.error(f"Erro ao abrir o arquivo: {e}")
+            sheet_names = list_sheets(encarte_copy, workbook)
+            if sheet_names:
+                st.session_state["encarte_upload"] = (uploaded_file.file_id, sheet_names, encarte_copy, workbook)
         if sheet_names:
             st.write("Selecione a planilha para processar:")
             selected_sheet = st.selectbox("Planilhas disponíveis", sheet_names)
@@ -48,30 +141,73 @@ else:
             st.error("Nenhuma planilha encontrada no arquivo.")
     
     ean_file = None
+    use_ean_store = False
+    save_ean_store = False
     if use_ean_file:
-        ean_file = st.file_uploader("Selecione o arquivo de EANs (opcional)", type=["xlsx", "xls", "csv"])
+        ean_source = st.radio("Fonte dos EANs", ["Usar repositório local de EANs", "Fazer upload de um arquivo de EANs"])
+        if ean_source == "Usar repositório local de EANs":
+            use_ean_store = True
+            from src.processors.ean_store import ean_store_info
+            store_info = ean_store_info()
+            if store_info and store_info["codes"]:
+                st.caption(f"{store_info['codes']} códigos, importados de {store_info.get('source', '?')} em {store_info.get('imported_at', '?')}.")
+            else:
+                st.warning("O repositório local de EANs está vazio. Faça upload de um arquivo mestre e marque a opção de salvá-lo.")
+        else:
+            ean_file = st.file_uploader("Selecione o arquivo de EANs (opcional)", type=["xlsx", "xls", "csv"])
+            save_ean_store = st.checkbox("Salvar este arquivo no repositório local de EANs", value=False)
+
+    output_mode = OUTPUT_MODE_OPTIONS[st.radio("Formato dos arquivos gerados", list(OUTPUT_MODE_OPTIONS))]
+
+    current_job = st.session_state.get("job")
+    job = get_job(current_job["id"], session_id) if current_job else None
+    job_running = job is not None and not job.finished
+
+    if st.button("Processar Promoções", disabled=job_running):
+        from src.processors.promotion_processor import process_promotions, process_promotions_cached
+        from src.processors.incremental import IncrementalState
+        from src.processors.ean_store import import_ean_master
+        from src.utils.data_utils import encarte_period
+        from src.utils.instrumentation import Instrumentation
 
-    if st.button("Processar Promoções"):
-        output_files = []
+        instrumentation = Instrumentation() if show_instrumentation else None
+        incremental = None
+        if use_incremental:
+            incremental = st.session_state.setdefault("incremental_state", IncrementalState())
         try:
-            with st.spinner("Processando..."):
-                start_dt = datetime.combine(start_date, datetime.min.time())
-                end_dt = datetime.combine(end_date, datetime.max.time().replace(second=0))
-                output_files = process_promotions(
-                    uploaded_file, ean_file, link_file, use_default_url,
-                    start_dt, end_dt, temp_dir,
-                    use_ean_file, use_link_file, apply_name_correction, selected_sheet
+            if save_ean_store and ean_file is not None:
+                with st.spinner("Atualizando o repositório local de EANs..."):
+                    stats = import_ean_master(ean_file)
+                st.success(
+                    f"Repositório local de EANs atualizado: {stats['inserted']} códigos novos, "
+                    f"{stats['updated']} alterados, {stats['unchanged']} sem mudança, {stats['removed']} removidos."
                 )
+            start_dt, end_dt = encarte_period(start_date, end_date)
+            # O processamento roda no pool do servidor com cópias dos arquivos enviados,
+            # de modo que os reruns da sessão (qualquer widget) não o interrompem
+            job_args = (
+                encarte_copy, snapshot_upload(ean_file), snapshot_upload(link_file), use_default_url,
+                start_dt, end_dt,
+                use_ean_file, use_link_file, apply_name_correction, selected_sheet
+            )
+            if instrumentation is not None or incremental is not None:
+                job = submit_job(
+                    session_id, process_promotions, *job_args, workbook=workbook,
+                    instrumentation=instrumentation, incremental=incremental, use_ean_store=use_ean_store,
+                    output_mode=output_mode, exclusive=instrumentation is not None
+                )
+            else:
+                job = submit_job(
+                    session_id, process_promotions_cached, *job_args, workbook=workbook,
+                    use_ean_store=use_ean_store, output_mode=output_mode
+                )
+            current_job = {"id": job.id, "instrumentation": instrumentation, "incremental": incremental}
+            st.session_state["job"] = current_job
+            job_running = True
         except Exception as e:
             st.error(f"Erro durante o processamento: {e}")
 
-        if output_files:
-            for filename, output in output_files:
-                st.download_button(
-                    label=f"Baixar {filename}",
-                    data=output,
-                    file_name=filename,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-        else:
-            st.warning("Nenhum arquivo foi gerado. Verifique os dados de entrada.")
\ No newline at end of file
+    if job_running:
+        show_job_progress(job.id)
+    elif job is not None:
+        show_job_result(job, current_job["instrumentation"], current_job["incremental"])
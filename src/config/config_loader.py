@@ -1,19 +1,90 @@
 import json
-import streamlit as st
+import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from src.utils.reporter import get_reporter
 
-def load_config():
-    """Carrega configurações do arquivo JSON"""
+# Caminhos dos arquivos de dados, independentes do diretório de execução
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONFIG_PATH = os.path.join(PROJECT_ROOT, "data", "config.json")
+DEFAULT_LINKS_PATH = os.path.join(PROJECT_ROOT, "data", "default_url.json")
+EAN_STORE_PATH = os.path.join(PROJECT_ROOT, "data", "ean_master.sqlite")
+
+def load_config(reporter=None):
+    """
+    Carrega configurações do arquivo JSON: (colunas obrigatórias, mapa comprador → carrossel,
+    correções de nomes, perfis de loja {perfil: [lojas]} na ordem de geração dos arquivos).
+    """
+    reporter = get_reporter(reporter)
     try:
-        with open("data/config.json", "r", encoding="utf-8") as f:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
             config = json.load(f)
         return (
             config["required_columns"],
             config["buyer_carrossel_map"],
-            config["product_name_corrections"]
+            config["product_name_corrections"],
+            config["store_profiles"]
         )
     except FileNotFoundError:
-        st.error("Arquivo config.json não encontrado. Certifique-se de que ele está no mesmo diretório do script.")
-        return None, None, None
+        reporter.error("Arquivo config.json não encontrado. Certifique-se de que ele está no mesmo diretório do script.")
+        return None, None, None, None
     except Exception as e:
-        st.error(f"Erro ao carregar config.json: {e}")
-        return None, None, None
\ No newline at end of file
+        reporter.error(f"Erro ao carregar config.json: {e}")
+        return None, None, None, None
+
+def build_store_mapping(store_profiles):
+    """Converte os perfis do config.json ({perfil: [lojas]}) no texto da coluna "Lojas" de cada perfil."""
+    return {profile: "-".join(str(store) for store in stores) for profile, stores in store_profiles.items()}
+
+@dataclass(frozen=True)
+class AppConfig:
+    """
+    config.json carregado uma única vez, somente leitura, com os motores de correção de
+    nomes e de carrossel já compilados; compartilhado entre execuções e threads.
+    """
+    stamp: tuple
+    required_columns: tuple
+    profiles: tuple
+    store_mapping: MappingProxyType
+    name_corrector: object
+    buyer_matcher: object
+
+_lock = threading.Lock()
+_app_config = None
+
+def config_stamp(path=CONFIG_PATH):
+    """Identifica a versão do config.json por tamanho e data de modificação (None se ausente)."""
+    try:
+        stat = os.stat(path)
+        return (stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return None
+
+def get_app_config(reporter=None):
+    """
+    Retorna o AppConfig do config.json, recompilado só quando o arquivo muda;
+    None (com o erro informado ao reporter) se ele não puder ser carregado.
+    """
+    global _app_config
+    stamp = config_stamp()
+    with _lock:
+        if _app_config is not None and _app_config.stamp == stamp:
+            return _app_config
+
+    required_columns, buyer_carrossel_map, product_name_corrections, store_profiles = load_config(reporter)
+    if required_columns is None or buyer_carrossel_map is None or product_name_corrections is None or store_profiles is None:
+        return None
+    # Importado aqui: compilar os motores exige pandas, desnecessário para quem só usa os caminhos
+    from src.utils.text_utils import ProductNameCorrector, BuyerCarrosselMatcher
+    config = AppConfig(
+        stamp=stamp,
+        required_columns=tuple(required_columns),
+        profiles=tuple(store_profiles),
+        store_mapping=MappingProxyType(build_store_mapping(store_profiles)),
+        name_corrector=ProductNameCorrector(product_name_corrections),
+        buyer_matcher=BuyerCarrosselMatcher(buyer_carrossel_map),
+    )
+    with _lock:
+        _app_config = config
+    return config
@@ -1,86 +1,98 @@
 import pandas as pd
-import streamlit as st
-from src.utils.text_utils import normalize_text, remove_suffix, correct_product_name
-from src.utils.ean_classifier import classify_ean
+from src.utils.text_utils import normalize_series, remove_suffix_series
+from src.utils.ean_classifier import classify_ean_series
+from src.utils.link_loader import resolve_image_urls
+from src.utils.reporter import get_reporter
+from src.utils.schema import apply_output_schema, URL_REVIEW_COLUMN
 
-def get_carrossel_value(normalized_buyer, mapping):
-    """Retorna o valor do carrossel se chave estiver contida no texto do comprador."""
-    if not normalized_buyer:
-        return ''
-    for key, value in mapping.items():
-        if key in normalized_buyer:
-            return value
-    return ''
-
-def build_final_dataframe(filtered_df, profile, start_date, end_date, store_map, apply_name_correction, link_map, buyer_carrossel_map, product_name_corrections):
-    """Constrói o DataFrame final para exportação"""
-    df_copy = filtered_df.copy()
-    df_copy['descrição do item'] = df_copy['descrição do item'].apply(remove_suffix)
+def build_row_columns(filtered_df, apply_name_correction, link_map, buyer_matcher, name_corrector, reporter=None):
+    """
+    Calcula as colunas que dependem só de cada linha (nome, carrossel, classificação, URL...)
+    de uma vez para as linhas CRM de todos os perfis, sem copiar nem alterar filtered_df.
+    """
+    reporter = get_reporter(reporter)
+    names = remove_suffix_series(filtered_df['descrição do item'])
 
     if apply_name_correction:
-        df_copy['descrição do item'] = df_copy['descrição do item'].apply(
-            lambda x: correct_product_name(x, product_name_corrections)
-        )
+        names = name_corrector.correct_series(names)
     else:
-        df_copy['descrição do item'] = df_copy['descrição do item'].apply(
-            lambda x: str(x).strip().upper() if not pd.isna(x) else ""
-        )
+        names = names.str.strip().str.upper()
 
-    if df_copy.empty:
-        st.warning(f"Nenhuma linha válida encontrada para o perfil {profile}. O arquivo não será gerado.")
-        return None
-
-    df_copy['ean'] = df_copy['ean'].astype(str).str.replace("/", ";", regex=False)
-    df_copy[['final_code_type', 'final_unit']] = df_copy['ean_original_encarte'].apply(
-        lambda x: pd.Series(classify_ean(x))
-    )
+    eans = filtered_df['ean'].astype(str).str.replace("/", ";", regex=False)
+    classification = classify_ean_series(filtered_df['ean_original_encarte'])
 
     possible_buyer_names = ['comprador', 'compradora', 'compradores', 'compradoras']
-    col_name = next((col for col in possible_buyer_names if col in df_copy.columns), None)
+    col_name = next((col for col in possible_buyer_names if col in filtered_df.columns), None)
 
     if col_name:
-        df_copy['comprador_normalized'] = df_copy[col_name].apply(normalize_text)
+        buyers_normalized = normalize_series(filtered_df[col_name])
     else:
-        df_copy['comprador_normalized'] = ''
-        st.warning("Nenhuma coluna de comprador encontrada. 'Carrossel' ficará vazio.")
+        buyers_normalized = pd.Series('', index=filtered_df.index)
+        reporter.warning("Nenhuma coluna de comprador encontrada. 'Carrossel' ficará vazio.")
+
+    urls, url_review = resolve_image_urls(eans, filtered_df.get('código'), names, link_map)
 
     # Aplica "8142 - Especial" para produtos com "DESTAQUE CRM" em "tipo ação"
-    df_copy['final_carrossel'] = df_copy.apply(
-        lambda row: "8142 - Especial" if "DESTAQUE CRM" in str(row['tipo ação']).upper() else get_carrossel_value(row['comprador_normalized'], buyer_carrossel_map),
-        axis=1
-    )
+    carrossel = buyer_matcher.match_series(buyers_normalized)
+    destaque_crm = filtered_df['tipo ação'].astype(str).str.upper().str.contains("DESTAQUE CRM", regex=False)
+    carrossel[destaque_crm.to_numpy()] = "8142 - Especial"
+
+    return pd.DataFrame({
+        "Nome": names,
+        "Carrossel": carrossel,
+        "Preço": filtered_df["preço de:"],
+        "Preço promocional": filtered_df["preço por:"],
+        "Unidade": classification["unit"],
+        "URL da imagem": urls,
+        "Tipo do código": classification["code_type"],
+        "Códigos dos produtos": eans,
+        URL_REVIEW_COLUMN: url_review
+    })
+
+def assemble_profile_dataframe(row_columns, profile, start_date, end_date, store_map, reporter=None):
+    """Monta o DataFrame final de um perfil a partir das suas linhas de build_row_columns."""
+    reporter = get_reporter(reporter)
+    if row_columns.empty:
+        reporter.warning(f"Nenhuma linha válida encontrada para o perfil {profile}. O arquivo não será gerado.")
+        return None
+
+    url_review = row_columns[URL_REVIEW_COLUMN]
+    if url_review.any():
+        reporter.warning(
+            f"{int(url_review.sum())} URLs de imagem do perfil {profile} foram encontradas pela semelhança "
+            "do nome do produto; confira as células destacadas em azul."
+        )
 
     result_df = pd.DataFrame({
-        "Nome": df_copy["descrição do item"],
-        "Carrossel": df_copy["final_carrossel"],
+        "Nome": row_columns["Nome"],
+        "Carrossel": row_columns["Carrossel"],
         "Check-In": "Não",
-        "Preço": df_copy["preço de:"],
-        "Preço promocional": df_copy["preço por:"],
+        "Preço": row_columns["Preço"],
+        "Preço promocional": row_columns["Preço promocional"],
         "Limite por cliente": 0,
         "Dias para Resgate após ativação": (end_date.date() - start_date.date()).days + 1,
-        "Unidade": df_copy["final_unit"],
+        "Unidade": row_columns["Unidade"],
         "Não exigir ativação no App": "Ativação automática",
         "Ativar em": start_date.strftime("%d/%m/%Y %H:%M"),
         "Inativar em": end_date.strftime("%d/%m/%Y %H:%M"),
-        "URL da imagem": "",
-        "Tipo do código": df_copy["final_code_type"],
-        "Códigos dos produtos": df_copy["ean"],
+        # Preencher URLs automaticamente com base no JSON de links (EAN, código ou nome)
+        "URL da imagem": row_columns["URL da imagem"],
+        "Tipo do código": row_columns["Tipo do código"],
+        "Códigos dos produtos": row_columns["Códigos dos produtos"],
         "Tipo Promocional": "De / por",
         "Sobrescrever lojas": "Sim",
-        "Lojas": store_map[profile]
+        "Lojas": store_map[profile],
+        URL_REVIEW_COLUMN: url_review
     })
 
-    # Preencher URLs automaticamente com base no JSON de links
-    urls = []
-    for ean_field in df_copy["ean"]:
-        link = ""
-        if pd.notna(ean_field):
-            for e in str(ean_field).replace("/", ";").split(";"):
-                e = e.strip()
-                if e and e in link_map:
-                    link = link_map[e]
-                    break
-        urls.append(link)
-    result_df["URL da imagem"] = urls
+    # Valores repetidos (constantes, unidade, carrossel...) como categorias
+    return apply_output_schema(result_df)
 
-    return result_df
\ No newline at end of file
+def build_final_dataframe(filtered_df, profile, start_date, end_date, store_map, apply_name_correction, link_map, buyer_matcher, name_corrector, reporter=None):
+    """Constrói o DataFrame final para exportação das linhas de um perfil (sem copiar nem alterar filtered_df)."""
+    reporter = get_reporter(reporter)
+    if filtered_df.empty:
+        reporter.warning(f"Nenhuma linha válida encontrada para o perfil {profile}. O arquivo não será gerado.")
+        return None
+    row_columns = build_row_columns(filtered_df, apply_name_correction, link_map, buyer_matcher, name_corrector, reporter)
+    return assemble_profile_dataframe(row_columns, profile, start_date, end_date, store_map, reporter)
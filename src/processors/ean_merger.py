@@ -1,54 +1,104 @@
 import os
+import numpy as np
 import pandas as pd
-import streamlit as st
+import pyarrow as pa
+import pyarrow.compute as pc
 from src.utils.data_utils import fix_if_date
+from src.utils.reporter import get_reporter
 
-def merge_ean_data(df_base, ean_file):
+def split_ean_pairs(codes, eans):
+    """Separa listas de EANs ("a/b", "a;b") em pares (código, ean), um EAN por linha, na ordem original."""
+    pairs = pd.DataFrame({
+        'código': codes.astype(str),
+        'ean': eans.astype(str).str.strip().str.replace('/', ';', regex=False).str.split(';')
+    }).explode('ean')
+    pairs['ean'] = pairs['ean'].str.strip()
+    return pairs[pairs['ean'].notna() & (pairs['ean'] != '')]
+
+def build_ean_index(df_ean):
+    """
+    Constrói o índice do arquivo mestre: pares (código, ean) na ordem das linhas. Códigos sem
+    EAN válido não geram pares (no merge, equivalem a códigos ausentes do mestre).
+    """
+    eans = df_ean['ean']
+    valid = eans.notna() & ~eans.astype(str).str.strip().isin(['', 'nan'])
+    return split_ean_pairs(df_ean.loc[valid, 'código'], eans[valid]).reset_index(drop=True)
+
+def merge_ean_index(df_base, ean_index):
+    """Junta o índice de EANs do mestre às linhas do encarte (EANs do mestre primeiro, sem repetições)."""
+    df_base['código'] = df_base['código'].astype(str).str.strip().str.replace('-', '')
+
+    encarte_eans = df_base['ean'].where(df_base['ean'].notna(), '').astype(str).str.strip()
+    encarte_eans = encarte_eans.str.replace('/', ';', regex=False).to_numpy(dtype=object)
+    codes = df_base['código'].to_numpy(dtype=object)
+    rows = np.arange(len(df_base))
+
+    # EANs do mestre de cada linha (junção pelo código, só com os pares dos códigos do encarte)
+    # seguidos dos EANs do próprio encarte; 'ordem' mantém a sequência do mestre e depois a do
+    # encarte dentro de cada linha
+    present = ean_index['código'].isin(codes).to_numpy()
+    master = pd.DataFrame({'linha': rows, 'código': codes}).merge(
+        ean_index.loc[present, ['código', 'ean']].assign(ordem=np.flatnonzero(present)), on='código'
+    )
+    parts = pc.split_pattern(pa.array(encarte_eans, type=pa.string()), ';')
+    flat = pc.list_flatten(parts)
+    stripped = pc.utf8_trim_whitespace(flat)
+    keep = pc.and_(pc.not_equal(stripped, ''), pc.not_equal(flat, 'nan')).to_numpy(zero_copy_only=False)
+
+    line = np.concatenate([master['linha'].to_numpy(), pc.list_parent_indices(parts).to_numpy()[keep]])
+    eans = np.concatenate([master['ean'].to_numpy(dtype=object), stripped.to_numpy(zero_copy_only=False)[keep]])
+    order = np.concatenate([master['ordem'].to_numpy(), len(ean_index) + np.arange(keep.sum())])
+    sort = np.lexsort((order, line))
+    line, eans = line[sort], eans[sort]
+
+    # Sem repetições dentro da linha (fica a primeira ocorrência)
+    ean_codes, uniques = pd.factorize(eans)
+    first = ~pd.Series(line.astype(np.int64) * max(len(uniques), 1) + ean_codes).duplicated().to_numpy()
+    line, eans = line[first], eans[first]
+
+    # Pares já ordenados por linha: junta cada fatia com os kernels do pyarrow
+    counts = np.bincount(line, minlength=len(df_base))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int32)
+    joined = pc.binary_join(pa.ListArray.from_arrays(offsets, pa.array(eans, type=pa.string())), ';')
+    joined = joined.to_numpy(zero_copy_only=False)
+
+    # Linhas sem nenhum EAN ficam com o texto original do encarte
+    df_base['ean'] = np.where(counts > 0, joined, encarte_eans)
+    return df_base
+
+def read_ean_master(ean_file):
+    """
+    Lê o arquivo mestre de EANs (xlsx, xls ou csv) com as colunas 'código' e 'ean'
+    normalizadas; retorna None se o formato não for suportado.
+    """
+    file_extension = os.path.splitext(ean_file.name)[1].lower()
+    # O mesmo arquivo pode ser lido em mais de uma execução (cache, modo incremental)
+    ean_file.seek(0)
+    if file_extension in ['.xlsx', '.xls']:
+        df_ean = pd.read_excel(ean_file, dtype={'ean': str})
+    elif file_extension == '.csv':
+        df_ean = pd.read_csv(ean_file, sep=';', dtype={'ean': str})
+    else:
+        return None
+
+    df_ean = df_ean.rename(columns={'CÓDIGO PRODUTO': 'código', 'CÓDIGO EAN': 'ean'})
+    if 'código' in df_ean.columns:
+        df_ean['código'] = df_ean['código'].apply(fix_if_date)
+    if 'ean' in df_ean.columns:
+        df_ean['ean'] = df_ean['ean'].apply(fix_if_date)
+
+    df_ean['código'] = df_ean['código'].astype(str).str.strip().str.replace('-', '')
+    return df_ean
+
+def merge_ean_data(df_base, ean_file, reporter=None):
     """Mescla dados de EAN do arquivo externo com o DataFrame base"""
+    reporter = get_reporter(reporter)
     try:
-        file_extension = os.path.splitext(ean_file.name)[1].lower()
-        if file_extension in ['.xlsx', '.xls']:
-            df_ean = pd.read_excel(ean_file, dtype={'ean': str})
-        elif file_extension == '.csv':
-            df_ean = pd.read_csv(ean_file, sep=';', dtype={'ean': str})
-        else:
-            st.error("Formato de arquivo de EANs não suportado. Use xlsx, xls ou csv.")
+        df_ean = read_ean_master(ean_file)
+        if df_ean is None:
+            reporter.error("Formato de arquivo de EANs não suportado. Use xlsx, xls ou csv.")
             return df_base
-        
-        df_ean = df_ean.rename(columns={'CÓDIGO PRODUTO': 'código', 'CÓDIGO EAN': 'ean'})
-        if 'código' in df_ean.columns:
-            df_ean['código'] = df_ean['código'].apply(fix_if_date)
-        if 'ean' in df_ean.columns:
-            df_ean['ean'] = df_ean['ean'].apply(fix_if_date)
-        
-        df_base['código'] = df_base['código'].astype(str).str.strip().str.replace('-', '')
-        df_ean['código'] = df_ean['código'].astype(str).str.strip().str.replace('-', '')
-        
-        expanded_rows = []
-        for _, row in df_base.iterrows():
-            new_row = row.copy()
-            encarte_ean = str(new_row['ean']).strip() if not pd.isna(new_row['ean']) else ""
-            encarte_ean = encarte_ean.replace('/', ';')
-            encarte_ean_list = [e.strip() for e in encarte_ean.split(';') if e.strip() and e != 'nan']
-            
-            matching_eans = df_ean[df_ean['código'] == new_row['código']]['ean']
-            
-            if not matching_eans.empty:
-                ean_list = []
-                for ean in matching_eans:
-                    if not pd.isna(ean) and str(ean).strip() and str(ean).strip() != 'nan':
-                        eans = str(ean).strip().replace('/', ';').split(';')
-                        ean_list.extend([e.strip() for e in eans if e.strip()])
-                ean_list.extend(encarte_ean_list)
-                ean_list = list(dict.fromkeys(ean_list))
-                new_row['ean'] = ';'.join(ean_list) if ean_list else encarte_ean
-            else:
-                new_row['ean'] = ';'.join(encarte_ean_list) if encarte_ean_list else encarte_ean
-            
-            expanded_rows.append(new_row)
-        
-        df_updated = pd.DataFrame(expanded_rows)
-        return df_updated
+        return merge_ean_index(df_base, build_ean_index(df_ean))
     except Exception as e:
-        st.error(f"Erro ao mesclar dados de EAN: {e}")
-        return df_base
\ No newline at end of file
+        reporter.error(f"Erro ao mesclar dados de EAN: {e}")
+        return df_base
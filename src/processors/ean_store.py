@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+import pandas as pd
+from src.config.config_loader import EAN_STORE_PATH
+from src.processors.ean_merger import read_ean_master, build_ean_index, merge_ean_index, split_ean_pairs
+from src.utils.reporter import get_reporter
+
+# Máximo de códigos por consulta (limite de parâmetros do SQLite)
+LOOKUP_BATCH_SIZE = 900
+
+_lock = threading.Lock()
+
+def connect_store(store_path):
+    """Abre o repositório local de EANs, criando as tabelas se necessário."""
+    conn = sqlite3.connect(store_path)
+    conn.execute("CREATE TABLE IF NOT EXISTS eans (código TEXT PRIMARY KEY, eans TEXT NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    return conn
+
+def import_ean_master(ean_file, store_path=EAN_STORE_PATH):
+    """
+    Importa um arquivo mestre completo para o repositório local, gravando apenas os códigos
+    novos ou com EANs diferentes e removendo os que não estão mais no mestre.
+    Retorna {'inserted', 'updated', 'unchanged', 'removed', 'total'}.
+    """
+    df_ean = read_ean_master(ean_file)
+    if df_ean is None:
+        raise ValueError("Formato de arquivo de EANs não suportado. Use xlsx, xls ou csv.")
+    # Códigos sem EAN válido também são gravados (com a lista vazia)
+    index = build_ean_index(df_ean)
+    encoded = index.groupby('código', sort=False)['ean'].agg(";".join)
+    encoded = encoded.reindex(df_ean['código'].unique(), fill_value="").to_dict()
+
+    with _lock, closing(connect_store(store_path)) as conn, conn:
+        existing = dict(conn.execute("SELECT código, eans FROM eans"))
+        changed = [(code, eans) for code, eans in encoded.items() if existing.get(code) != eans]
+        removed = [(code,) for code in existing if code not in encoded]
+        conn.executemany(
+            "INSERT INTO eans VALUES (?, ?) ON CONFLICT(código) DO UPDATE SET eans = excluded.eans",
+            changed
+        )
+        conn.executemany("DELETE FROM eans WHERE código = ?", removed)
+        conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", {
+            "imported_at": datetime.now().isoformat(timespec="seconds"),
+            "source": getattr(ean_file, "name", ""),
+        }.items())
+
+    inserted = sum(1 for code, _ in changed if code not in existing)
+    return {
+        "inserted": inserted,
+        "updated": len(changed) - inserted,
+        "unchanged": len(encoded) - len(changed),
+        "removed": len(removed),
+        "total": len(encoded),
+    }
+
+def ean_store_info(store_path=EAN_STORE_PATH):
+    """Retorna {'codes', 'imported_at', 'source'} do repositório local, ou None se ele não existir."""
+    if not os.path.exists(store_path):
+        return None
+    with closing(connect_store(store_path)) as conn:
+        info = dict(conn.execute("SELECT key, value FROM meta"))
+        info["codes"] = conn.execute("SELECT COUNT(*) FROM eans").fetchone()[0]
+    return info
+
+def lookup_ean_index(codes, store_path=EAN_STORE_PATH):
+    """Consulta (pelo índice da chave primária) os EANs dos códigos informados, como pares (código, ean)."""
+    codes = list(codes)
+    found = []
+    with closing(connect_store(store_path)) as conn:
+        for start in range(0, len(codes), LOOKUP_BATCH_SIZE):
+            batch = codes[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            found.extend(conn.execute(f"SELECT código, eans FROM eans WHERE código IN ({placeholders})", batch))
+    found = pd.DataFrame(found, columns=['código', 'eans'])
+    return split_ean_pairs(found['código'], found['eans']).reset_index(drop=True)
+
+def merge_ean_store(df_base, store_path=EAN_STORE_PATH, reporter=None):
+    """Mescla os EANs do repositório local, consultando apenas os códigos presentes no encarte."""
+    reporter = get_reporter(reporter)
+    info = ean_store_info(store_path)
+    if not info or not info["codes"]:
+        reporter.error("Repositório local de EANs vazio. Importe um arquivo mestre de EANs antes de usá-lo.")
+        return df_base
+    try:
+        codes = df_base['código'].astype(str).str.strip().str.replace('-', '').unique()
+        return merge_ean_index(df_base, lookup_ean_index(codes, store_path))
+    except Exception as e:
+        reporter.error(f"Erro ao mesclar dados de EAN: {e}")
+        return df_base
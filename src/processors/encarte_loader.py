@@ -0,0 +1,86 @@
+import os
+import pandas as pd
+from pandas.io.parsers import TextParser
+from src.processors.header_detector import detect_header_with_scoring
+from src.utils.schema import arrow_string_dtype
+
+HEADER_PROBE_ROWS = 20
+
+# Linhas por parte na leitura em partes de CSVs grandes
+CSV_CHUNK_ROWS = 50_000
+
+def open_workbook(uploaded_file):
+    """Abre o arquivo Excel uma única vez; retorna None para CSV ou formatos não suportados."""
+    file_extension = os.path.splitext(uploaded_file.name)[1].lower()
+    if file_extension not in ['.xlsx', '.xls']:
+        return None
+    return pd.ExcelFile(uploaded_file)
+
+def promote_header_row(raw_df, header_row, dtype=None):
+    """
+    Promove a linha header_row de uma planilha lida sem cabeçalho (dtype=object)
+    a nomes de colunas, com a mesma inferência de tipos do read_excel(header=...).
+    """
+    rows = raw_df.where(raw_df.notna(), '').values.tolist()
+    return TextParser(rows, header=header_row, dtype=dtype).read()
+
+def load_encarte(uploaded_file, sheet_name, required_columns, workbook=None):
+    """
+    Lê o encarte consolidado com um único parse do arquivo.
+    Retorna (DataFrame, erros), no mesmo formato de detect_header_with_scoring.
+    """
+    file_extension = os.path.splitext(uploaded_file.name)[1].lower()
+    try:
+        if file_extension in ['.xlsx', '.xls']:
+            if workbook is None:
+                workbook = pd.ExcelFile(uploaded_file)
+            raw_df = workbook.parse(sheet_name, header=None, dtype=object)
+            probe_df = raw_df.head(HEADER_PROBE_ROWS)
+        elif file_extension == '.csv':
+            uploaded_file.seek(0)
+            probe_df = pd.read_csv(uploaded_file, sep=';', header=None, nrows=HEADER_PROBE_ROWS, dtype={'ean': str})
+        else:
+            return None, ["Formato de arquivo base não suportado. Use xlsx, xls ou csv."]
+    except Exception as e:
+        return None, [f"Erro ao ler o arquivo base: {e}"]
+
+    header_row, errors = detect_header_with_scoring(probe_df, required_columns)
+    if errors:
+        return None, errors
+
+    try:
+        if file_extension == '.csv':
+            uploaded_file.seek(0)
+            df_base = pd.read_csv(uploaded_file, sep=';', header=header_row, dtype={'ean': str})
+        else:
+            df_base = promote_header_row(raw_df, header_row, dtype={'ean': str})
+    except Exception as e:
+        return None, [f"Erro ao ler o arquivo com o cabeçalho detectado: {e}"]
+
+    return df_base, []
+
+def read_encarte_csv_chunks(uploaded_file, required_columns, chunksize=CSV_CHUNK_ROWS):
+    """
+    Detecta o cabeçalho nas primeiras linhas do CSV e devolve um leitor que percorre
+    o restante em partes de chunksize linhas, com colunas de texto (Arrow).
+    Retorna (leitor, erros), no mesmo formato de load_encarte.
+    """
+    try:
+        uploaded_file.seek(0)
+        probe_df = pd.read_csv(uploaded_file, sep=';', header=None, nrows=HEADER_PROBE_ROWS, dtype={'ean': str})
+    except Exception as e:
+        return None, [f"Erro ao ler o arquivo base: {e}"]
+
+    header_row, errors = detect_header_with_scoring(probe_df, required_columns)
+    if errors:
+        return None, errors
+
+    try:
+        uploaded_file.seek(0)
+        reader = pd.read_csv(
+            uploaded_file, sep=';', header=header_row, dtype=arrow_string_dtype(), chunksize=chunksize
+        )
+    except Exception as e:
+        return None, [f"Erro ao ler o arquivo com o cabeçalho detectado: {e}"]
+
+    return reader, []
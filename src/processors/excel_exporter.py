@@ -1,63 +1,97 @@
-import math
-import openpyxl
-from openpyxl.styles import PatternFill
-
-def export_to_excel(df_final, filepath):
-    """Exporta DataFrame para Excel com formatação especial"""
-    df_final.to_excel(filepath, index=False, engine="openpyxl")
-    wb = openpyxl.load_workbook(filepath)
-    ws = wb.active
-
-    # Aplicar formato de texto à coluna "Códigos dos produtos"
-    header_values = [cell.value for cell in ws[1]]
-    ean_col = header_values.index("Códigos dos produtos") + 1
-
-    for row_idx in range(2, ws.max_row + 1):
-        ws.cell(row=row_idx, column=ean_col).number_format = '@'
-
-    yellow_fill = PatternFill(start_color='FFFF00', end_color='FFFF00', fill_type='solid')
-    red_fill = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
-
-    # Identificação de colunas existentes
-    header_values = [cell.value for cell in ws[1]]
-    preco_col = header_values.index("Preço") + 1
-    preco_promo_col = header_values.index("Preço promocional") + 1
-    unidade_col = header_values.index("Unidade") + 1
-    tipo_codigo_col = header_values.index("Tipo do código") + 1
-
-    for row_idx in range(2, ws.max_row + 1):
-
-        # ========== EAN EM VERMELHO ==========
-        ean_cell = ws.cell(row=row_idx, column=ean_col)
-        ean_val = ean_cell.value
-
-        if (
-            ean_val is None
-            or str(ean_val).strip() == ""
-            or str(ean_val).strip().lower() == "nan"
-            or (isinstance(ean_val, float) and math.isnan(ean_val))
-        ):
-            ean_cell.fill = red_fill
-
-        preco_cell = ws.cell(row=row_idx, column=preco_col)
-        preco_promo_cell = ws.cell(row=row_idx, column=preco_promo_col)
-        unidade_cell = ws.cell(row=row_idx, column=unidade_col)
-        tipo_codigo_cell = ws.cell(row=row_idx, column=tipo_codigo_col)
-
-        if preco_cell.value is None or str(preco_cell.value).strip() in ("", "nan") or (
-            isinstance(preco_cell.value, float) and math.isnan(preco_cell.value)
-        ):
-            preco_cell.fill = red_fill
-
-        if preco_promo_cell.value is None or str(preco_promo_cell.value).strip() in ("", "nan") or (
-            isinstance(preco_promo_cell.value, float) and math.isnan(preco_promo_cell.value)
-        ):
-            preco_promo_cell.fill = red_fill
-
-        if str(unidade_cell.value).strip().upper() == "QUILOGRAMA":
-            unidade_cell.fill = yellow_fill
-
-        if str(tipo_codigo_cell.value).strip().upper() == "INTERNO":
-            tipo_codigo_cell.fill = yellow_fill
-
-    wb.save(filepath)
+import re
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Font, Border, Side, Alignment
+from src.utils.schema import HIDDEN_COLUMN_PREFIX, URL_REVIEW_COLUMN, EAN_ISSUE_COLUMN
+
+YELLOW_FILL = PatternFill(start_color='FFFF00', end_color='FFFF00', fill_type='solid')
+RED_FILL = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
+BLUE_FILL = PatternFill(start_color='BDD7EE', end_color='BDD7EE', fill_type='solid')
+ORANGE_FILL = PatternFill(start_color='FFC000', end_color='FFC000', fill_type='solid')
+
+# Mesmo estilo de cabeçalho aplicado pelo DataFrame.to_excel
+HEADER_FONT = Font(bold=True)
+HEADER_BORDER = Border(
+    left=Side(style='thin'), right=Side(style='thin'),
+    top=Side(style='thin'), bottom=Side(style='thin')
+)
+HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='top')
+
+def blank_mask(series, ignore_case=False):
+    """Marca células vazias, NaN ou com o texto 'nan'."""
+    text = series.astype(str).str.strip()
+    if ignore_case:
+        text = text.str.lower()
+    return (series.isna() | text.isin(["", "nan"])).to_numpy()
+
+def equals_mask(series, value):
+    """Marca células cujo texto (sem espaços, em maiúsculo) é igual a value."""
+    return (series.astype(str).str.strip().str.upper() == value).to_numpy()
+
+def build_highlights(df_final):
+    """Pré-calcula, por coluna, as máscaras de destaque (vermelho, amarelo, azul e laranja)."""
+    highlights = {
+        "Códigos dos produtos": [(blank_mask(df_final["Códigos dos produtos"], ignore_case=True), RED_FILL)],
+        "Preço": [(blank_mask(df_final["Preço"]), RED_FILL)],
+        "Preço promocional": [(blank_mask(df_final["Preço promocional"]), RED_FILL)],
+        "Unidade": [(equals_mask(df_final["Unidade"], "QUILOGRAMA"), YELLOW_FILL)],
+        "Tipo do código": [(equals_mask(df_final["Tipo do código"], "INTERNO"), YELLOW_FILL)],
+    }
+    # URLs encontradas por semelhança de nome, a conferir
+    if URL_REVIEW_COLUMN in df_final.columns:
+        highlights["URL da imagem"] = [(df_final[URL_REVIEW_COLUMN].to_numpy(dtype=bool), BLUE_FILL)]
+    # EANs inválidos, convertidos em data ou repetidos
+    if EAN_ISSUE_COLUMN in df_final.columns:
+        highlights["Códigos dos produtos"].append((df_final[EAN_ISSUE_COLUMN].to_numpy(dtype=bool), ORANGE_FILL))
+    return highlights
+
+def header_cell(ws, value):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.font = HEADER_FONT
+    cell.border = HEADER_BORDER
+    cell.alignment = HEADER_ALIGNMENT
+    return cell
+
+def sheet_title(name):
+    """Nome de aba válido no Excel (sem []:*?/\\ e com até 31 caracteres)."""
+    return re.sub(r'[\[\]:*?/\\]', '_', name)[:31]
+
+def write_sheet(wb, title, df_final):
+    """
+    Grava df_final, com formatação especial, como uma nova aba de um Workbook write-only;
+    as linhas vão direto para o arquivo, sem manter as células em memória.
+    """
+    columns = [col for col in df_final.columns if not str(col).startswith(HIDDEN_COLUMN_PREFIX)]
+    ean_col = columns.index("Códigos dos produtos")
+    highlights = {
+        columns.index(col): masks for col, masks in build_highlights(df_final).items()
+    }
+
+    ws = wb.create_sheet(title)
+    ws.append([header_cell(ws, col) for col in columns])
+
+    visible = df_final[columns]
+    values = visible.astype(object).where(visible.notna(), None)
+    for row_pos, row in enumerate(values.itertuples(index=False, name=None)):
+        row = list(row)
+        for col_idx, masks in highlights.items():
+            fill = next((fill for mask, fill in masks if mask[row_pos]), None)
+            if fill is None and col_idx != ean_col:
+                continue
+            cell = WriteOnlyCell(ws, value=row[col_idx])
+            if fill is not None:
+                cell.fill = fill
+            # Aplicar formato de texto à coluna "Códigos dos produtos"
+            if col_idx == ean_col:
+                cell.number_format = '@'
+            row[col_idx] = cell
+        ws.append(row)
+
+def export_to_excel(df_final, output):
+    """
+    Exporta DataFrame para Excel com formatação especial em uma única passada
+    (modo write-only). output pode ser um caminho ou um buffer (ex.: BytesIO).
+    """
+    wb = Workbook(write_only=True)
+    write_sheet(wb, "Sheet1", df_final)
+    wb.save(output)
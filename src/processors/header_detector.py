@@ -1,5 +1,5 @@
 import pandas as pd
-from src.utils.text_utils import normalize_text
+from src.utils.text_utils import normalize_series
 
 def detect_header_with_scoring(df, required_columns):
     """
@@ -10,16 +10,15 @@ def detect_header_with_scoring(df, required_columns):
     header_row = None
     row_found = None
 
+    # Colunas obrigatórias são normalizadas uma única vez
+    normalized_required = dict(zip(required_columns, normalize_series(pd.Series(required_columns, dtype=object))))
+
     # Limitar iteração às primeiras 20 linhas
     limited_df = df.head(20)
     
     for idx, row in limited_df.iterrows():
-        score = 0
-        normalized_row = [normalize_text(str(cell)) for cell in row if not pd.isna(cell)]
-
-        for col in required_columns:
-            if normalize_text(col) in normalized_row:
-                score += 1
+        normalized_row = set(normalize_series(row.dropna().astype(str)))
+        score = sum(1 for col in required_columns if normalized_required[col] in normalized_row)
 
         if score > max_score:
             max_score = score
@@ -32,7 +31,7 @@ def detect_header_with_scoring(df, required_columns):
         return None, errors
 
     # Verificar se todas as obrigatórias estão presentes
-    missing_cols = [col for col in required_columns if normalize_text(col) not in row_found]
+    missing_cols = [col for col in required_columns if normalized_required[col] not in row_found]
     if missing_cols:
         errors = [
             f"❌ Coluna obrigatória '{col}' não encontrada na linha {header_row + 1} do arquivo do Encarte Consolidado. Verifique a digitação do título da coluna."
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+from src.utils.schema import apply_output_schema
+
+# Máximo de linhas de saída guardadas por estado incremental (as mais antigas saem primeiro)
+ROW_STORE_MAX_ROWS = 500_000
+
+# Identidade de uma linha do encarte entre versões, para o resumo de diferenças
+IDENTITY_COLUMNS = ['perfil de loja', 'código']
+
+def row_fingerprints(df):
+    """Hash (uint64) do conteúdo de cada linha normalizada, independente do índice."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+def identity_fingerprints(df_filtered):
+    """Agrupa as impressões digitais das linhas por (perfil de loja, código)."""
+    keys = df_filtered[IDENTITY_COLUMNS].astype(str)
+    fingerprints = pd.Series(row_fingerprints(df_filtered), index=df_filtered.index)
+    grouped = fingerprints.groupby([keys[col] for col in IDENTITY_COLUMNS], sort=False)
+    return {key: frozenset(values) for key, values in grouped}
+
+class IncrementalState:
+    """
+    Estado do modo incremental de uma sessão: as linhas de saída já construídas, por
+    impressão digital da linha de entrada, e a versão anterior do encarte para o
+    resumo de linhas novas, removidas e alteradas.
+    As linhas guardadas valem apenas para o mesmo contexto (datas, links, configuração...).
+    """
+
+    def __init__(self, max_rows=ROW_STORE_MAX_ROWS):
+        self.max_rows = max_rows
+        self.context_key = None
+        self.rows = None
+        self.previous_version = None
+        self.last_diff = None
+        self.reused = 0
+        self.computed = 0
+
+    def begin(self, context_key):
+        """Inicia uma execução; descarta as linhas guardadas se o contexto mudou."""
+        if context_key != self.context_key:
+            self.context_key = context_key
+            self.rows = None
+        self.reused = 0
+        self.computed = 0
+
+    def compare_version(self, df_filtered):
+        """Compara as linhas CRM com a versão anterior e guarda esta como a nova referência."""
+        current = identity_fingerprints(df_filtered)
+        previous = self.previous_version
+        if previous is None:
+            self.last_diff = None
+        else:
+            self.last_diff = {
+                "added": [key for key in current if key not in previous],
+                "removed": [key for key in previous if key not in current],
+                "changed": [key for key in current if key in previous and current[key] != previous[key]],
+            }
+        self.previous_version = current
+        return self.last_diff
+
+    def build_profile(self, df_profile, build_func):
+        """
+        Monta o DataFrame final de um perfil reaproveitando as linhas já construídas;
+        build_func (ex.: build_final_dataframe parcial) só recebe as linhas novas ou alteradas.
+        """
+        fingerprints = row_fingerprints(df_profile)
+        rows = self.rows
+        parts = []
+        missing = np.ones(len(fingerprints), dtype=bool)
+        if rows is not None:
+            reused = rows[rows.index.isin(fingerprints)]
+            missing = ~np.isin(fingerprints, reused.index)
+            if len(reused):
+                parts.append(reused)
+
+        new_rows = None
+        if missing.any():
+            built = build_func(df_profile[missing])
+            if built is None:
+                return None
+            built.index = fingerprints[missing]
+            new_rows = built[~built.index.duplicated()]
+            parts.append(new_rows)
+
+        df_final = (pd.concat(parts) if len(parts) > 1 else parts[0]).reindex(fingerprints)
+        df_final.index = df_profile.index
+
+        self.reused += int((~missing).sum())
+        self.computed += int(missing.sum())
+        if new_rows is not None:
+            if self.rows is not None:
+                new_rows = pd.concat([self.rows, new_rows[~new_rows.index.isin(self.rows.index)]])
+            self.rows = new_rows.iloc[-self.max_rows:]
+        return apply_output_schema(df_final)
+
+    def summary(self):
+        """Mensagem com o resumo da execução incremental."""
+        total = self.reused + self.computed
+        message = f"Modo incremental: {self.reused} de {total} linhas reaproveitadas, {self.computed} recalculadas."
+        if self.last_diff is not None:
+            message += (
+                f" Em relação à versão anterior: {len(self.last_diff['added'])} códigos novos, "
+                f"{len(self.last_diff['removed'])} removidos e {len(self.last_diff['changed'])} alterados."
+            )
+        return message
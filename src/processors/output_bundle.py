@@ -0,0 +1,80 @@
+import os
+import zipfile
+from io import BytesIO
+from openpyxl import Workbook
+from src.processors.excel_exporter import write_sheet, sheet_title
+
+# Modos de saída: um arquivo por perfil, uma planilha com uma aba por perfil ou um .zip com os arquivos
+OUTPUT_FILES = "files"
+OUTPUT_WORKBOOK = "workbook"
+OUTPUT_ZIP = "zip"
+OUTPUT_MODES = (OUTPUT_FILES, OUTPUT_WORKBOOK, OUTPUT_ZIP)
+
+# Nome (sem extensão) do arquivo único dos modos workbook e zip
+BUNDLE_NAME = "promo_CRM"
+
+OUTPUT_MIME_TYPES = {
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".zip": "application/zip",
+}
+
+def output_mime_type(filename):
+    """Tipo MIME de um arquivo gerado, pela extensão."""
+    return OUTPUT_MIME_TYPES.get(os.path.splitext(filename)[1].lower(), "application/octet-stream")
+
+class OutputBundle:
+    """
+    Reúne as saídas dos perfis, na ordem em que são adicionadas, conforme o modo de saída:
+    arquivos separados, abas de uma única planilha ou entradas de um único .zip.
+    Nos modos de arquivo único cada perfil é gravado ao ser adicionado e descartado em
+    seguida, de modo que só o arquivo final fica em memória.
+    """
+
+    def __init__(self, output_mode=OUTPUT_FILES):
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"Modo de saída inválido: {output_mode}. Use {', '.join(OUTPUT_MODES)}.")
+        self.output_mode = output_mode
+        self.files = []
+        self.count = 0
+        self.output = BytesIO()
+        self.archive = None
+        self.workbook = None
+        if output_mode == OUTPUT_ZIP:
+            # Os .xlsx já são compactados: as entradas são apenas armazenadas
+            self.archive = zipfile.ZipFile(self.output, "w", zipfile.ZIP_STORED)
+        elif output_mode == OUTPUT_WORKBOOK:
+            self.workbook = Workbook(write_only=True)
+
+    @property
+    def filename(self):
+        """Nome do arquivo único (None no modo de um arquivo por perfil)."""
+        if self.output_mode == OUTPUT_FILES:
+            return None
+        return BUNDLE_NAME + (".zip" if self.output_mode == OUTPUT_ZIP else ".xlsx")
+
+    def add_file(self, filename, output):
+        """Adiciona o arquivo .xlsx de um perfil (modos files e zip)."""
+        if self.archive is not None:
+            self.archive.writestr(filename, output.getvalue())
+            output.close()
+        else:
+            self.files.append((filename, output))
+        self.count += 1
+
+    def add_sheet(self, profile, df_final):
+        """Grava o DataFrame final de um perfil como uma aba da planilha única (modo workbook)."""
+        write_sheet(self.workbook, sheet_title(profile), df_final)
+        self.count += 1
+
+    def finish(self):
+        """Conclui o arquivo único, se houver, e retorna [(nome do arquivo, BytesIO)]."""
+        if self.output_mode == OUTPUT_FILES:
+            return self.files
+        if self.archive is not None:
+            self.archive.close()
+        if not self.count:
+            return []
+        if self.workbook is not None:
+            self.workbook.save(self.output)
+        self.output.seek(0)
+        return [(self.filename, self.output)]
@@ -1,64 +1,94 @@
+import difflib
+import multiprocessing
 import os
-import pandas as pd
-import streamlit as st
+import threading
 from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import warnings
 
-from src.config.config_loader import load_config
-from src.processors.header_detector import detect_header_with_scoring
+import pandas as pd
+
+from src.config.config_loader import get_app_config, DEFAULT_LINKS_PATH
+from src.processors.encarte_loader import load_encarte, read_encarte_csv_chunks
 from src.processors.ean_merger import merge_ean_data
-from src.processors.dataframe_builder import build_final_dataframe
+from src.processors.ean_store import merge_ean_store
+from src.processors.dataframe_builder import build_final_dataframe, build_row_columns, assemble_profile_dataframe
 from src.processors.excel_exporter import export_to_excel
-from src.utils.data_utils import fix_if_date, clean_price_value
-from src.utils.link_loader import load_links_json
-from src.utils.file_utils import get_unique_filename
+from src.processors.output_bundle import OutputBundle, OUTPUT_FILES, OUTPUT_WORKBOOK
+from src.utils.data_utils import fix_if_date, parse_price_series, copy_price_from_previous_row
+from src.utils.link_loader import load_links_json, LinkIndex
+from src.utils.reporter import get_reporter, CollectingReporter
+from src.utils.instrumentation import measure
+from src.utils.ean_validator import validate_ean_series
+from src.utils.schema import apply_working_schema, EAN_ISSUE_COLUMN
+from src.utils.result_cache import run_context_key, result_cache_key, get_cached_result, store_result
 
 # Suprime avisos específicos do openpyxl
 warnings.filterwarnings("ignore", category=UserWarning, module='openpyxl')
 
-def process_promotions(uploaded_file, ean_file, link_file, use_default_url, start_date, end_date, temp_dir, use_ean_file, use_link_file, apply_name_correction, sheet_name):
-    """Função principal para processar as promoções"""
-    
-    # Carregar configurações
-    required_columns, buyer_carrossel_map, product_name_corrections = load_config()
-    if required_columns is None or buyer_carrossel_map is None or product_name_corrections is None:
-        st.stop()
-    
-    profiles = ["GERAL/PREMIUM", "GERAL", "PREMIUM"]
-    store_mapping = {
-        "GERAL": "4368-4363-4362-4357-4360-4356-4370-4359-4372-4353-4371-4365-4369-4361-4366-4354-4355-4364",
-        "PREMIUM": "4373-4358-4367-5839",
-        "GERAL/PREMIUM": "4368-4363-4362-4357-4360-4356-4370-4359-4372-4353-4371-4365-4369-4361-4366-4354-4355-4364-4373-4358-4367-5839"
-    }
-
-    file_extension = os.path.splitext(uploaded_file.name)[1].lower()
-    try:
-        if file_extension in ['.xlsx', '.xls']:
-            temp_df = pd.read_excel(uploaded_file, sheet_name=sheet_name, header=None, dtype={'ean': str})
-        elif file_extension == '.csv':
-            temp_df = pd.read_csv(uploaded_file, sep=';', header=None, dtype={'ean': str})
-        else:
-            st.error("Formato de arquivo base não suportado. Use xlsx, xls ou csv.")
-            return []
-    except Exception as e:
-        st.error(f"Erro ao ler o arquivo base: {e}")
-        return []
+# Máximo de perfis montados/exportados ao mesmo tempo (limitado ao número de CPUs)
+PROFILE_WORKERS = 4
 
-    header_row, errors = detect_header_with_scoring(temp_df, required_columns)
-    if errors:
-        for msg in errors:
-            st.error(msg)
-        return []
+# Processos que montam e exportam os perfis, criados no primeiro uso e reaproveitados
+# entre execuções (o import do pandas/openpyxl em cada processo é pago uma única vez)
+_pool_lock = threading.Lock()
+_profile_pool = None
 
-    try:
-        if file_extension in ['.xlsx', '.xls']:
-            df_base = pd.read_excel(uploaded_file, sheet_name=sheet_name, header=header_row, dtype={'ean': str})
-        else:
-            df_base = pd.read_csv(uploaded_file, sep=';', header=header_row, dtype={'ean': str})
-    except Exception as e:
-        st.error(f"Erro ao ler o arquivo com o cabeçalho detectado: {e}")
-        return []
+# Coluna auxiliar com o texto original dos preços não reconhecidos, por coluna de preço
+INVALID_PRICE_COLUMNS = {"preço de:": "invalid_preço_de", "preço por:": "invalid_preço_por"}
+
+# Preços não reconhecidos listados no aviso (os demais são apenas contados)
+INVALID_PRICE_EXAMPLES = 10
+
+def profile_pool_size():
+    """Processos do pool de perfis: PROFILE_WORKERS, limitado ao número de CPUs."""
+    return max(1, min(PROFILE_WORKERS, os.cpu_count() or 1))
+
+def get_profile_pool():
+    """Retorna o pool de processos dos perfis, criando-o no primeiro uso."""
+    global _profile_pool
+    with _pool_lock:
+        if _profile_pool is None:
+            # spawn: o processo do servidor tem várias threads, e fork copiaria locks ocupados
+            _profile_pool = ProcessPoolExecutor(
+                max_workers=profile_pool_size(), mp_context=multiprocessing.get_context("spawn")
+            )
+        return _profile_pool
 
+def discard_profile_pool(wait=False):
+    """
+    Descarta o pool de perfis (ex.: um processo morreu); o próximo uso cria outro.
+    Com wait, aguarda o fim dos processos (obrigatório antes de encerrar um processo
+    que usou o pool: os processos do pool não são daemon e o prenderiam aberto).
+    """
+    global _profile_pool
+    with _pool_lock:
+        pool, _profile_pool = _profile_pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+def partition_profiles(df_filtered, profiles, reporter):
+    """
+    Separa as linhas CRM por perfil de loja em uma única passada: {perfil: posições das linhas}.
+    Valores de perfil não configurados são informados de uma vez, com o perfil mais parecido.
+    """
+    groups = df_filtered.groupby("perfil de loja", sort=False, observed=True).indices
+    unknown = [(value, len(positions)) for value, positions in groups.items() if value not in profiles]
+    if unknown:
+        details = []
+        for value, count in unknown:
+            close = difflib.get_close_matches(str(value).strip().upper(), profiles, n=1)
+            hint = f' (seria "{close[0]}"?)' if close else ""
+            details.append(f'"{value}" ({count} linhas){hint}')
+        reporter.warning("Perfis de loja não configurados no config.json, linhas ignoradas: " + "; ".join(details) + ".")
+    return {profile: groups[profile] for profile in profiles if profile in groups}
+
+def prepare_base_frame(df_base, previous_row=None):
+    """
+    Padroniza colunas, corrige códigos/EANs lidos como data e limpa e completa os preços.
+    Na leitura em partes, previous_row é a última linha preparada da parte anterior.
+    """
     df_base.columns = df_base.columns.str.strip().str.replace(r'\s+', ' ', regex=True).str.lower()
     
     if 'código' in df_base.columns:
@@ -68,72 +98,350 @@ def process_promotions(uploaded_file, ean_file, link_file, use_default_url, star
         df_base['ean'] = df_base['ean'].fillna("").replace("nan", "")
 
     df_base['ean_original_encarte'] = df_base['ean']
-    df_base["preço de:"] = df_base["preço de:"].apply(clean_price_value)
-    df_base["preço por:"] = df_base["preço por:"].apply(clean_price_value)
-    df_base["copied_preço_de"] = False
-    df_base["copied_preço_por"] = False
-
-    # Copiar preços de linhas anteriores quando necessário
-    for i in range(len(df_base)):
-        if pd.isna(df_base.iloc[i]["preço de:"]) and i > 0:
-            current_ean = str(df_base.iloc[i]["ean"]) if not pd.isna(df_base.iloc[i]["ean"]) else ""
-            prev_ean = str(df_base.iloc[i-1]["ean"]) if not pd.isna(df_base.iloc[i-1]["ean"]) else ""
-            if current_ean[:7] == prev_ean[:7] and not pd.isna(df_base.iloc[i-1]["preço de:"]):
-                df_base.iloc[i, df_base.columns.get_loc("preço de:")] = df_base.iloc[i-1]["preço de:"]
-                df_base.iloc[i, df_base.columns.get_loc("copied_preço_de")] = True
-        
-        if pd.isna(df_base.iloc[i]["preço por:"]) and i > 0:
-            current_ean = str(df_base.iloc[i]["ean"]) if not pd.isna(df_base.iloc[i]["ean"]) else ""
-            prev_ean = str(df_base.iloc[i-1]["ean"]) if not pd.isna(df_base.iloc[i-1]["ean"]) else ""
-            if current_ean[:7] == prev_ean[:7] and not pd.isna(df_base.iloc[i-1]["preço por:"]):
-                df_base.iloc[i, df_base.columns.get_loc("preço por:")] = df_base.iloc[i-1]["preço por:"]
-                df_base.iloc[i, df_base.columns.get_loc("copied_preço_por")] = True
-
-    if use_ean_file and ean_file:
-        df_base = merge_ean_data(df_base, ean_file)
-
-    df_base['perfil de loja'] = df_base['perfil de loja'].ffill()
-    df_base['tipo ação'] = df_base['tipo ação'].ffill()
-    df_filtered = df_base[df_base["tipo ação"].str.contains("CRM", case=False, na=False)]
-
-    os.makedirs(temp_dir, exist_ok=True)
-    output_files = []
-
-    link_map = {}
-    if use_link_file:
-        if use_default_url:
-            try:
-                link_map = load_links_json("data/default_url.json")
-            except FileNotFoundError:
-                st.error("Repositório de links não encontrado no diretório do projeto.")
-        elif link_file:
-            link_map = load_links_json(link_file)
+    # Preços não reconhecidos guardam o texto original em INVALID_PRICE_COLUMNS, para o aviso
+    invalid = {}
+    for col, invalid_col in INVALID_PRICE_COLUMNS.items():
+        prices, failed = parse_price_series(df_base[col])
+        df_base[invalid_col] = df_base[col].where(failed)
+        df_base[col] = prices
+        invalid[col] = failed
 
-    for profile in profiles:
-        df_profile = df_filtered[df_filtered["perfil de loja"] == profile].copy()
-        if df_profile.empty:
-            st.warning(f"Nenhuma linha encontrada para o perfil {profile}. Pulando geração.")
+    # Copiar preços de linhas anteriores quando necessário; um preço preenchido mas
+    # ilegível não é um preço vazio: fica sem cópia (e destacado) e interrompe a sequência
+    for (col, failed), flag_col in zip(invalid.items(), ["copied_preço_de", "copied_preço_por"]):
+        df_base = copy_price_from_previous_row(df_base, col, flag_col, previous_row=previous_row, unreadable=failed)
+    return df_base
+
+def report_invalid_prices(df_filtered, reporter):
+    """Informa em uma única mensagem os preços das linhas CRM que não puderam ser lidos."""
+    examples = []
+    for col, invalid_col in INVALID_PRICE_COLUMNS.items():
+        if invalid_col not in df_filtered.columns:
             continue
-        
-        df_final = build_final_dataframe(
-            df_profile, profile, start_date, end_date, store_mapping, 
-            apply_name_correction, link_map, buyer_carrossel_map, product_name_corrections
+        invalid = df_filtered[invalid_col]
+        mask = invalid.notna()
+        examples.extend(
+            f'código {code}, {col} "{value}"'
+            for code, value in zip(df_filtered.loc[mask, 'código'], invalid[mask])
         )
-        if df_final is None or df_final.empty:
-            st.warning(f"O DataFrame final do perfil {profile} está vazio. Pulando exportação.")
-            continue
+    if not examples:
+        return
+    shown = "; ".join(examples[:INVALID_PRICE_EXAMPLES])
+    more = f" e mais {len(examples) - INVALID_PRICE_EXAMPLES}" if len(examples) > INVALID_PRICE_EXAMPLES else ""
+    reporter.warning(
+        f"{len(examples)} preços não reconhecidos ficaram vazios (destacados em vermelho): {shown}{more}."
+    )
+
+def filter_crm_rows(df_base, previous_row=None):
+    """
+    Propaga perfil de loja e tipo ação para as linhas em branco e mantém só as linhas CRM.
+    Na leitura em partes, previous_row traz os valores vigentes ao fim da parte anterior.
+    """
+    for col in ['perfil de loja', 'tipo ação']:
+        df_base[col] = df_base[col].ffill()
+        if previous_row is not None and pd.notna(previous_row[col]):
+            df_base[col] = df_base[col].fillna(previous_row[col])
+    return df_base[df_base["tipo ação"].str.contains("CRM", case=False, na=False)]
+
+def stream_crm_rows(chunks):
+    """
+    Prepara e filtra um CSV lido em partes, levando entre as partes o estado da cópia de
+    preços e do ffill; só as linhas CRM ficam em memória.
+    """
+    previous_row = None
+    kept = []
+    for chunk in chunks:
+        chunk = prepare_base_frame(chunk, previous_row)
+        crm_rows = filter_crm_rows(chunk, previous_row)
+        if len(chunk):
+            previous_row = chunk.iloc[-1]
+        kept.append(crm_rows)
+    return pd.concat(kept)
+
+def merge_eans(df_base, ean_file, reporter):
+    """Mescla os EANs do arquivo enviado ou, na falta dele, do repositório local."""
+    if ean_file is not None:
+        return merge_ean_data(df_base, ean_file, reporter)
+    return merge_ean_store(df_base, reporter=reporter)
+
+def flag_ean_issues(df_final, profile, reporter):
+    """Marca (para destaque em laranja) as linhas com EAN inválido, convertido em data ou repetido."""
+    flags, summary = validate_ean_series(df_final["Códigos dos produtos"])
+    df_final = df_final.assign(**{EAN_ISSUE_COLUMN: flags.any(axis=1).to_numpy()})
+    if any(summary.values()):
+        reporter.warning(
+            f"Perfil {profile}: {summary['invalid']} EANs com dígito verificador inválido, "
+            f"{summary['date_mangled']} convertidos em data e {summary['duplicate']} repetidos "
+            f"(destacados em laranja)."
+        )
+    return df_final
+
+def build_profile_output(df_profile, profile, start_date, end_date, store_mapping, apply_name_correction, link_map, buyer_matcher, name_corrector, instrumentation=None, incremental=None, row_columns=None, export=True):
+    """
+    Constrói e exporta o arquivo de um perfil (no processo atual ou em um processo do pool).
+    Com row_columns (as linhas do perfil já transformadas por build_row_columns) só monta
+    o arquivo, e df_profile, link_map, buyer_matcher e name_corrector podem ser None.
+    Retorna ((nome do arquivo, BytesIO) ou None, CollectingReporter com as mensagens do perfil);
+    com export=False, o primeiro item é (perfil, DataFrame final), a ser gravado como aba.
+    """
+    reporter = CollectingReporter()
+
+    def build(rows):
+        return build_final_dataframe(
+            rows, profile, start_date, end_date, store_mapping,
+            apply_name_correction, link_map, buyer_matcher, name_corrector, reporter
+        )
+
+    rows_in = len(row_columns) if row_columns is not None else len(df_profile)
+    with measure(instrumentation, "build", rows_in, profile) as record:
+        if incremental is not None:
+            df_final = incremental.build_profile(df_profile, build)
+        elif row_columns is not None:
+            df_final = assemble_profile_dataframe(row_columns, profile, start_date, end_date, store_mapping, reporter)
+        else:
+            df_final = build(df_profile)
+        record["rows_out"] = 0 if df_final is None else len(df_final)
+    if df_final is None or df_final.empty:
+        reporter.warning(f"O DataFrame final do perfil {profile} está vazio. Pulando exportação.")
+        return None, reporter
+
+    # Conferido sobre o arquivo completo (também no modo incremental): repetições dependem das outras linhas
+    with measure(instrumentation, "ean_validation", len(df_final), profile):
+        df_final = flag_ean_issues(df_final, profile, reporter)
+    if not export:
+        return (profile, df_final), reporter
+
+    filename = f"promo_{profile.replace('/', '_')}_CRM.xlsx"
+    output = BytesIO()
+    with measure(instrumentation, "export", len(df_final), profile) as record:
+        export_to_excel(df_final, output)
+        record["rows_out"] = len(df_final)
+    output.seek(0)
+
+    reporter.success(f"✅ Arquivo gerado: {filename}")
+    return (filename, output), reporter
+
+def process_promotions(uploaded_file, ean_file, link_file, use_default_url, start_date, end_date, use_ean_file, use_link_file, apply_name_correction, sheet_name, workbook=None, reporter=None, instrumentation=None, incremental=None, use_ean_store=False, output_mode=OUTPUT_FILES, parallel_profiles=True):
+    """
+    Função principal para processar as promoções.
+    As mensagens vão para reporter (padrão: interface Streamlit); se instrumentation
+    (Instrumentation) for informado, registra tempo, memória e linhas de cada etapa.
+    Com incremental (IncrementalState), só as linhas novas ou alteradas desde as
+    execuções anteriores do mesmo estado são reconstruídas.
+    Com use_ean_store (e sem arquivo de EANs enviado), os EANs vêm do repositório local.
+    output_mode escolhe entre um arquivo por perfil (OUTPUT_FILES), uma planilha com uma
+    aba por perfil (OUTPUT_WORKBOOK) ou um único .zip com os arquivos (OUTPUT_ZIP).
+    Com parallel_profiles=False os perfis são montados em sequência neste processo (ex.:
+    quando quem chama já processa vários encartes em paralelo).
+    """
+    reporter = get_reporter(reporter)
+    if instrumentation is not None:
+        instrumentation.start()
+    try:
+        return run_promotion_stages(
+            uploaded_file, ean_file, link_file, use_default_url, start_date, end_date,
+            use_ean_file, use_link_file, apply_name_correction, sheet_name, workbook, reporter, instrumentation, incremental, use_ean_store, output_mode, parallel_profiles
+        )
+    finally:
+        if instrumentation is not None:
+            instrumentation.finish()
+
+def process_promotions_cached(uploaded_file, ean_file, link_file, use_default_url, start_date, end_date, use_ean_file, use_link_file, apply_name_correction, sheet_name, workbook=None, reporter=None, use_ean_store=False, output_mode=OUTPUT_FILES):
+    """
+    process_promotions com cache por conteúdo dos arquivos e parâmetros: uma execução
+    repetida devolve os arquivos e as mensagens guardados sem reprocessar.
+    Retorna (arquivos, True se veio do cache).
+    """
+    reporter = get_reporter(reporter)
+    key = result_cache_key(
+        uploaded_file, ean_file, link_file, use_default_url, start_date, end_date,
+        use_ean_file, use_link_file, apply_name_correction, sheet_name, use_ean_store, output_mode
+    )
+    cached = get_cached_result(key)
+    if cached is not None:
+        output_files, messages = cached
+        collected = CollectingReporter()
+        collected.messages = messages
+        collected.replay(reporter)
+        return output_files, True
 
-        filename = f"promo_{profile.replace('/', '_')}_CRM.xlsx"
-        filepath = os.path.join(temp_dir, filename)
-        filepath = get_unique_filename(filepath)
+    # As mensagens são guardadas para o cache; as etapas (e o cancelamento) vão direto ao reporter
+    collected = CollectingReporter(progress_reporter=reporter)
+    try:
+        output_files = process_promotions(
+            uploaded_file, ean_file, link_file, use_default_url, start_date, end_date,
+            use_ean_file, use_link_file, apply_name_correction, sheet_name,
+            workbook=workbook, reporter=collected, use_ean_store=use_ean_store, output_mode=output_mode
+        )
+    finally:
+        collected.replay(reporter)
+    if output_files and not collected.errors:
+        store_result(key, output_files, collected.messages)
+    return output_files, False
+
+def run_promotion_stages(uploaded_file, ean_file, link_file, use_default_url, start_date, end_date, use_ean_file, use_link_file, apply_name_correction, sheet_name, workbook, reporter, instrumentation, incremental, use_ean_store, output_mode, parallel_profiles):
+    """Etapas de process_promotions, medidas individualmente quando há instrumentação."""
+    # Destino das saídas dos perfis (valida o modo de saída antes de qualquer leitura)
+    bundle = OutputBundle(output_mode)
+
+    # Carregar configurações (compiladas uma vez e reaproveitadas enquanto o config.json não mudar)
+    reporter.progress("Carregando configurações", 0.0)
+    config = get_app_config(reporter)
+    if config is None:
+        return []
+    required_columns = config.required_columns
+    name_corrector = config.name_corrector
+    buyer_matcher = config.buyer_matcher
+    profiles = config.profiles
+    store_mapping = config.store_mapping
+
+    if os.path.splitext(uploaded_file.name)[1].lower() == '.csv':
+        # CSV: lido em partes, preparado e filtrado parte a parte; só as linhas CRM ficam em memória
+        reporter.progress("Lendo o encarte", 0.05)
+        with measure(instrumentation, "load_csv_stream") as record:
+            reader, errors = read_encarte_csv_chunks(uploaded_file, required_columns)
+            if not errors:
+                try:
+                    with reader:
+                        df_filtered = stream_crm_rows(reader)
+                except Exception as e:
+                    errors = [f"Erro ao ler o arquivo com o cabeçalho detectado: {e}"]
+            record["rows_out"] = None if errors else len(df_filtered)
+        if errors:
+            for msg in errors:
+                reporter.error(msg)
+            return []
 
-        export_to_excel(df_final, filepath)
+        if (use_ean_file and ean_file) or use_ean_store:
+            reporter.progress("Mesclando EANs", 0.3)
+            with measure(instrumentation, "ean_merge", len(df_filtered)) as record:
+                df_filtered = merge_eans(df_filtered, ean_file if use_ean_file else None, reporter)
+                record["rows_out"] = len(df_filtered)
+    else:
+        reporter.progress("Lendo o encarte", 0.05)
+        with measure(instrumentation, "load") as record:
+            df_base, errors = load_encarte(uploaded_file, sheet_name, required_columns, workbook)
+            record["rows_out"] = 0 if df_base is None else len(df_base)
+        if errors:
+            for msg in errors:
+                reporter.error(msg)
+            return []
 
-        with open(filepath, "rb") as f:
-            output = BytesIO(f.read())
-            output.seek(0)
+        reporter.progress("Preparando as linhas", 0.2)
+        with measure(instrumentation, "prepare", len(df_base)) as record:
+            df_base = prepare_base_frame(df_base)
+            record["rows_out"] = len(df_base)
+
+        if (use_ean_file and ean_file) or use_ean_store:
+            reporter.progress("Mesclando EANs", 0.3)
+            with measure(instrumentation, "ean_merge", len(df_base)) as record:
+                df_base = merge_eans(df_base, ean_file if use_ean_file else None, reporter)
+                record["rows_out"] = len(df_base)
+
+        reporter.progress("Filtrando as linhas CRM", 0.35)
+        with measure(instrumentation, "filter", len(df_base)) as record:
+            df_filtered = filter_crm_rows(df_base)
+            record["rows_out"] = len(df_filtered)
+
+    report_invalid_prices(df_filtered, reporter)
+
+    # Tipos compactos (categorias e strings Arrow) para as linhas CRM de todos os perfis
+    df_filtered = apply_working_schema(df_filtered)
+
+    if incremental is not None:
+        incremental.begin(run_context_key(link_file, use_default_url, start_date, end_date, use_link_file, apply_name_correction))
+        incremental.compare_version(df_filtered)
+
+    link_map = LinkIndex()
+    if use_link_file:
+        reporter.progress("Carregando links de imagens", 0.4)
+        with measure(instrumentation, "links") as record:
+            if use_default_url:
+                try:
+                    link_map = load_links_json(DEFAULT_LINKS_PATH, reporter)
+                except FileNotFoundError:
+                    reporter.error("Repositório de links não encontrado no diretório do projeto.")
+            elif link_file:
+                link_map = load_links_json(link_file, reporter)
+            record["rows_out"] = len(link_map)
+
+    # Particiona os perfis em uma única passada; fora do modo incremental as transformações
+    # por linha (nome, carrossel, EAN, URL) rodam uma vez para todos os perfis
+    partitions = partition_profiles(df_filtered, profiles, reporter)
+    row_columns = None
+    if incremental is None and partitions:
+        reporter.progress("Transformando as linhas", 0.42)
+        with measure(instrumentation, "transform", len(df_filtered)) as record:
+            row_columns = build_row_columns(df_filtered, apply_name_correction, link_map, buyer_matcher, name_corrector, reporter)
+            record["rows_out"] = len(row_columns)
+
+    # Cada perfil é montado e exportado em um processo do pool (as threads ficariam presas
+    # ao GIL); as mensagens de cada perfil são reenviadas na ordem configurada dos perfis.
+    # Na planilha única os processos só montam os perfis: as abas são gravadas aqui, em
+    # ordem, no mesmo workbook. Com instrumentação (tracemalloc e cProfile medem só o
+    # processo atual), no modo incremental (estado em memória) ou com uma única CPU, os
+    # perfis rodam em sequência neste processo
+    export = output_mode != OUTPUT_WORKBOOK
+    pool = None
+    if (parallel_profiles and row_columns is not None and instrumentation is None
+            and profile_pool_size() > 1 and len(partitions) > 1):
+        pool = get_profile_pool()
+        # MappingProxyType não é serializável
+        pool_store_mapping = dict(store_mapping)
+
+    def run_profile(profile, positions):
+        if row_columns is not None:
+            df_profile, profile_rows = None, row_columns.iloc[positions]
+        else:
+            df_profile, profile_rows = df_filtered.iloc[positions], None
+        if pool is not None:
+            return pool.submit(
+                build_profile_output, None, profile, start_date, end_date, pool_store_mapping,
+                apply_name_correction, None, None, None, None, None, profile_rows, export
+            )
+        return build_profile_output(
+            df_profile, profile, start_date, end_date, store_mapping, apply_name_correction,
+            link_map, buyer_matcher, name_corrector, instrumentation, incremental, profile_rows, export
+        )
+
+    # Com o pool, todos os perfis são enviados de uma vez; em sequência, cada um roda ao ser lido
+    jobs = []
+    for profile in profiles:
+        positions = partitions.get(profile)
+        future = run_profile(profile, positions) if pool is not None and positions is not None else None
+        jobs.append((profile, positions, future))
+    try:
+        for position, (profile, positions, future) in enumerate(jobs):
+            reporter.progress(f"Gerando perfil {profile}", 0.45 + 0.55 * position / len(jobs))
+            if positions is None:
+                reporter.warning(f"Nenhuma linha encontrada para o perfil {profile}. Pulando geração.")
+                continue
+            output_file, profile_reporter = future.result() if future is not None else run_profile(profile, positions)
+            profile_reporter.replay(reporter)
+            if output_file is None:
+                continue
+            if export:
+                bundle.add_file(*output_file)
+                continue
+            _, df_final = output_file
+            with measure(instrumentation, "export", len(df_final), profile) as record:
+                bundle.add_sheet(profile, df_final)
+                record["rows_out"] = len(df_final)
+            reporter.success(f"✅ Aba gerada: {profile}")
+    except BrokenProcessPool:
+        discard_profile_pool()
+        raise
+    except BaseException:
+        # Processamento interrompido (ex.: cancelado): não inicia os perfis ainda na fila
+        for _, _, future in jobs:
+            if future is not None:
+                future.cancel()
+        raise
 
-        output_files.append((filename, output))
-        st.success(f"✅ Arquivo gerado: {filename}")
+    output_files = bundle.finish()
+    if output_files and bundle.filename is not None:
+        reporter.success(f"✅ Arquivo gerado: {bundle.filename} ({bundle.count} perfis)")
 
-    return output_files
\ No newline at end of file
+    if incremental is not None:
+        reporter.success(incremental.summary())
+    return output_files
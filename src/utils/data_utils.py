@@ -1,6 +1,23 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from datetime import datetime
 
+# Removidos dos preços em texto: símbolo da moeda e espaços (inclusive não separáveis)
+PRICE_NOISE = ("R$", "r$", " ", "\xa0", "\u202f", "\t")
+
+# Número (já sem separador de milhar e com ponto decimal) aceito como preço
+PRICE_NUMBER_PATTERN = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+
+# Separador de milhar seguido sempre de exatamente três dígitos, com decimal opcional no outro separador
+# (o ponto, como em "R$ 1.299", é milhar mesmo sozinho)
+DOT_THOUSANDS_PATTERN = r"^[+-]?[1-9]\d{0,2}(\.\d{3})+(,\d+)?$"
+COMMA_THOUSANDS_PATTERN = r"^[+-]?[1-9]\d{0,2}(,\d{3})+(\.\d+)?$"
+
+# Texto com no máximo um separador (fora o caso acima): ele é o decimal
+SINGLE_SEPARATOR_PATTERN = r"^[^.,]*[.,]?[^.,]*$"
+
 def fix_if_date(value):
     """Corrige códigos interpretados como datas"""
     if pd.isna(value):
@@ -13,10 +30,88 @@ def fix_if_date(value):
             return str_value[:-2]
         return str_value
 
-def clean_price_value(value):
-    """Limpa string de preço e converte para float, retornando None se inválido."""
-    try:
-        text = str(value).replace("R$", "").replace(",", ".").strip()
-        return float(text)
-    except:
-        return None
\ No newline at end of file
+def encarte_period(start_date, end_date):
+    """Converte as datas do encarte em datetimes de ativação (00:00) e inativação (23:59)."""
+    start_dt = datetime.combine(start_date, datetime.min.time())
+    end_dt = datetime.combine(end_date, datetime.max.time().replace(second=0))
+    return start_dt, end_dt
+
+def parse_price_series(series):
+    """
+    Converte uma coluna de preços inteira para float, aceitando números nativos do Excel e
+    textos como "R$ 1.299,90", "1,299.90", "12,90" ou "12.90" (com espaços comuns ou não separáveis).
+    Separadores de milhar precisam ser seguidos de grupos de três dígitos ("1,2,3" ou "1.2,50"
+    falham em vez de virar 123 ou 12.5); um ponto seguido de três dígitos é sempre milhar
+    ("R$ 1.299" é 1299). Fora isso, um separador único é o decimal.
+    Retorna (preços float64, máscara das células preenchidas que não puderam ser lidas).
+    """
+    failed = pd.Series(False, index=series.index)
+    if pd.api.types.infer_dtype(series, skipna=True) in ("floating", "integer", "mixed-integer-float", "empty"):
+        return pd.to_numeric(series).astype("float64"), failed
+
+    # Textos (e números misturados a eles): só os valores distintos são limpos, com os kernels do pyarrow
+    codes, uniques = pd.factorize(series)
+    if any(not isinstance(value, str) and value in (0, 1) for value in uniques):
+        # True/False se agrupariam com 1/0: viram texto (e falham) antes de agrupar
+        is_bool = np.frompyfunc(lambda value: isinstance(value, (bool, np.bool_)), 1, 1)(series.to_numpy()).astype(bool)
+        codes, uniques = pd.factorize(series.where(~is_bool, series.astype(str)))
+    text = pa.array(pd.Index(uniques).astype(str).to_numpy(dtype=object), type=pa.string())
+    for noise in PRICE_NOISE:
+        text = pc.replace_substring(text, noise, "")
+    cleaned = pc.if_else(
+        pc.match_substring_regex(text, DOT_THOUSANDS_PATTERN),
+        pc.replace_substring(pc.replace_substring(text, ".", ""), ",", "."),
+        pc.if_else(
+            pc.match_substring_regex(text, SINGLE_SEPARATOR_PATTERN),
+            pc.replace_substring(text, ",", "."),
+            pc.if_else(
+                pc.match_substring_regex(text, COMMA_THOUSANDS_PATTERN),
+                pc.replace_substring(text, ",", ""),
+                pa.scalar(None, pa.string())
+            )
+        )
+    )
+    valid = pc.fill_null(pc.match_substring_regex(cleaned, PRICE_NUMBER_PATTERN), False)
+    parsed = pc.cast(pc.if_else(valid, cleaned, pa.scalar(None, pa.string())), pa.float64())
+    # Células só com espaços, "R$" ou "nan" contam como vazias, não como falha
+    blank = pc.match_substring_regex(text, r"(?i)^(nan|none)?$")
+    unique_failed = pc.invert(pc.or_(valid, blank)).to_numpy(zero_copy_only=False)
+
+    present = codes >= 0
+    prices = np.full(len(series), np.nan)
+    prices[present] = parsed.to_numpy(zero_copy_only=False)[codes[present]]
+    failed[present] = unique_failed[codes[present]]
+    return pd.Series(prices, index=series.index), failed
+
+def copy_price_from_previous_row(df, price_col, flag_col, prefix_len=7, previous_row=None, unreadable=None):
+    """
+    Preenche preços vazios com o preço da linha anterior quando os primeiros
+    dígitos do EAN coincidem, marcando as linhas copiadas em flag_col.
+    Cópias se propagam em sequência (a linha copiada serve de origem para a próxima).
+    previous_row é a última linha já processada da parte anterior (leitura em partes).
+    unreadable marca preços preenchidos mas ilegíveis (já NaN): não recebem cópia e
+    interrompem a sequência, como um preço preenchido.
+    """
+    prices = df[price_col]
+    prefix = df["ean"].where(df["ean"].notna(), "").astype(str).str[:prefix_len]
+
+    # Cada bloco começa em um preço preenchido (legível ou não) ou em uma quebra de prefixo;
+    # dentro do bloco, só a primeira linha pode ser origem da cópia.
+    starts = prices.notna() | (prefix != prefix.shift())
+    if unreadable is not None:
+        starts |= unreadable
+    starts.iloc[:1] = True
+    block = starts.cumsum()
+    filled = prices.groupby(block).transform("first")
+
+    # O primeiro bloco continua o último da parte anterior quando o prefixo se mantém
+    first_is_empty = len(df) and pd.isna(prices.iloc[0]) and (unreadable is None or not unreadable.iloc[0])
+    if previous_row is not None and first_is_empty:
+        previous_prefix = "" if pd.isna(previous_row["ean"]) else str(previous_row["ean"])[:prefix_len]
+        if prefix.iloc[0] == previous_prefix:
+            filled[block == 1] = previous_row[price_col]
+
+    copied = prices.isna() & filled.notna()
+    df.loc[copied, price_col] = filled[copied]
+    df[flag_col] = copied
+    return df
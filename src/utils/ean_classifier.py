@@ -1,5 +1,41 @@
+import numpy as np
 import pandas as pd
 
+def split_ean_tokens(series):
+    """
+    Separa os campos de EAN ('/' ou ';') de uma coluna inteira em uma Series de códigos,
+    indexada pela posição da linha de origem (0..n-1), na ordem original e sem vazios.
+    """
+    text = series.reset_index(drop=True)
+    text = text.where(text.notna(), "").astype(str).str.replace("/", ";", regex=False)
+    tokens = text.str.split(";").explode().str.strip()
+    return tokens[tokens != ""]
+
+def ean_token_lengths(series):
+    """Retorna (tamanho do primeiro código, tamanho do maior código) por linha; NaN se vazia."""
+    lengths = split_ean_tokens(series).str.len().groupby(level=0)
+    positions = range(len(series))
+    return lengths.first().reindex(positions), lengths.max().reindex(positions)
+
+def classify_ean_series(series):
+    """
+    Classifica uma coluna de EANs, retornando DataFrame com 'code_type' e 'unit'.
+    Regras:
+      - Se o primeiro código tiver < 10 dígitos → Interno, Quilograma
+      - Caso contrário (ou campo vazio) → EAN, Unidade
+    """
+    first_len, _ = ean_token_lengths(series)
+    interno = (first_len < 10).to_numpy()
+    return pd.DataFrame({
+        "code_type": np.where(interno, "Interno", "EAN"),
+        "unit": np.where(interno, "Quilograma", "Unidade")
+    }, index=series.index)
+
+def get_code_type_series(series):
+    """Retorna o tipo de código por linha: 'Interno' se todos os códigos têm < 10 dígitos."""
+    _, max_len = ean_token_lengths(series)
+    return pd.Series(np.where((max_len < 10).to_numpy(), "Interno", "EAN"), index=series.index)
+
 def classify_ean(ean_str):
     """
     Classifica o EAN retornando uma tupla (tipo_codigo, unidade).
@@ -7,34 +43,9 @@ def classify_ean(ean_str):
       - Se todos os códigos < 10 dígitos → Interno, Quilograma
       - Caso contrário → EAN, Unidade
     """
-    if not ean_str or pd.isna(ean_str) or not str(ean_str).strip():
-        return ("EAN", "Unidade")
-
-    ean_str = str(ean_str).replace("/", ";")
-    eans = [e.strip() for e in ean_str.split(';') if e.strip()]
-    if not eans:
-        return ("EAN", "Unidade")
-    
-    first_ean = eans[0]
-    first_len = len(first_ean)
-
-    if first_len < 10:
-        return ("Interno", "Quilograma")
-    else:
-        return ("EAN", "Unidade")
+    result = classify_ean_series(pd.Series([ean_str], dtype=object)).iloc[0]
+    return (result["code_type"], result["unit"])
 
 def get_code_type(ean):
     """Retorna o tipo de código baseado no EAN"""
-    if pd.isna(ean) or not str(ean).strip():
-        return 'EAN'
-    
-    ean_str = str(ean).replace("/", ";")
-    eans = [e.strip() for e in ean_str.split(';') if e.strip()]
-    if not eans:
-        return 'EAN'
-    
-    lens = [len(e) for e in eans]
-    if all(l < 10 for l in lens):
-        return 'Interno'
-    else:
-        return 'EAN'
\ No newline at end of file
+    return get_code_type_series(pd.Series([ean], dtype=object)).iloc[0]
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Tamanhos de GTIN com dígito verificador conferido
+GTIN_LENGTHS = (8, 12, 13, 14)
+
+# Códigos abaixo deste tamanho são internos (mesma regra do classificador) e não são conferidos
+MIN_GTIN_LENGTH = 10
+
+# Pesos do dígito verificador com o código alinhado à direita em 14 posições
+GTIN_WEIGHTS = np.array([3, 1] * 6 + [3], dtype=np.int64)
+
+# Formato gerado por fix_if_date quando o Excel converteu o código em data (ex.: "2024-5")
+DATE_MANGLED_PATTERN = r"\d{4}-\d{1,2}"
+
+def gtin_check_digit_valid(tokens):
+    """Confere o dígito verificador de GTINs (só dígitos, 8 a 14 posições) em uma única operação vetorial."""
+    tokens = tokens if isinstance(tokens, pa.Array) else pa.array(tokens, type=pa.string())
+    if len(tokens) == 0:
+        return np.zeros(0, dtype=bool)
+    # Alinhados à direita em 14 posições, os códigos ocupam um buffer contíguo de n x 14 bytes
+    padded = pc.utf8_lpad(tokens, width=14, padding="0")
+    offsets = np.frombuffer(padded.buffers()[1], dtype=np.int32)[padded.offset:padded.offset + len(padded) + 1]
+    data = np.frombuffer(padded.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]]
+    digits = (data.reshape(-1, 14) - ord("0")).astype(np.int64)
+    total = digits[:, :13] @ GTIN_WEIGHTS
+    return (10 - total % 10) % 10 == digits[:, 13]
+
+def split_ean_tokens_arrow(series):
+    """Separa os EANs ('/' ou ';') de uma coluna em (posição da linha, código) com pyarrow, sem vazios."""
+    text = pa.array(series.where(series.notna(), "").astype(str).to_numpy(dtype=object), type=pa.string())
+    lists = pc.split_pattern(pc.replace_substring(text, "/", ";"), ";")
+    rows = pc.list_parent_indices(lists).to_numpy()
+    tokens = pc.utf8_trim_whitespace(pc.list_flatten(lists))
+    keep = pc.not_equal(tokens, "")
+    return rows[keep.to_numpy(zero_copy_only=False)], tokens.filter(keep)
+
+def validate_ean_series(series):
+    """
+    Confere os EANs de uma coluna inteira (listas separadas por ';' ou '/') em uma única passada.
+    Retorna (DataFrame por linha com 'invalid', 'date_mangled' e 'duplicate', resumo {problema: quantidade}).
+      - invalid: código com 10+ posições que não é um GTIN-12/13/14 com dígito verificador correto
+      - date_mangled: código convertido em data pelo Excel (ex.: "2024-5")
+      - duplicate: EAN repetido na mesma linha ou em mais de uma linha da planilha
+    """
+    rows, tokens = split_ean_tokens_arrow(series)
+    lengths = pc.utf8_length(tokens).to_numpy(zero_copy_only=False)
+    only_digits = pc.ascii_is_decimal(tokens).to_numpy(zero_copy_only=False)
+    date_mangled = pc.match_substring_regex(tokens, f"^{DATE_MANGLED_PATTERN}$").to_numpy(zero_copy_only=False)
+
+    checked = only_digits & np.isin(lengths, GTIN_LENGTHS) & (lengths >= MIN_GTIN_LENGTH)
+    valid_check = np.zeros(len(tokens), dtype=bool)
+    valid_check[checked] = gtin_check_digit_valid(tokens.filter(pa.array(checked)))
+    invalid = ~date_mangled & (lengths >= MIN_GTIN_LENGTH) & ~valid_check
+
+    # Repetições: o mesmo (linha, código) mais de uma vez, ou o mesmo código em linhas diferentes
+    codes, uniques = pd.factorize(tokens.to_numpy(zero_copy_only=False))
+    pair_ids = rows.astype(np.int64) * max(len(uniques), 1) + codes
+    repeated_in_row = pd.Series(pair_ids).duplicated().to_numpy()
+    rows_per_code = np.bincount(codes[~repeated_in_row], minlength=len(uniques))
+    duplicate = repeated_in_row | (rows_per_code[codes] > 1)
+
+    n_rows = len(series)
+    flags = pd.DataFrame({
+        name: np.bincount(rows[mask], minlength=n_rows) > 0
+        for name, mask in [("invalid", invalid), ("date_mangled", date_mangled), ("duplicate", duplicate)]
+    }, index=series.index)
+
+    summary = {
+        "invalid": int(invalid.sum()),
+        "date_mangled": int(date_mangled.sum()),
+        "duplicate": int(len(np.unique(codes[duplicate]))),
+    }
+    return flags, summary
@@ -1,29 +1,20 @@
 import os
 import pandas as pd
-import streamlit as st
+from src.utils.reporter import get_reporter
 
-def get_unique_filename(path):
-    """Recebe um caminho de arquivo e retorna um nome único no mesmo diretório."""
-    base, ext = os.path.splitext(path)
-    counter = 1
-    new_path = path
-    while os.path.exists(new_path):
-        new_path = f"{base} ({counter}){ext}"
-        counter += 1
-    return new_path
-
-def list_sheets(uploaded_file):
+def list_sheets(uploaded_file, workbook=None, reporter=None):
     """Lista planilhas disponíveis em um arquivo Excel ou retorna opção padrão para CSV"""
+    reporter = get_reporter(reporter)
     file_extension = os.path.splitext(uploaded_file.name)[1].lower()
     try:
         if file_extension in ['.xlsx', '.xls']:
-            xl = pd.ExcelFile(uploaded_file)
+            xl = workbook if workbook is not None else pd.ExcelFile(uploaded_file)
             return xl.sheet_names
         elif file_extension == '.csv':
             return ["Planilha CSV"]
         else:
-            st.error("Formato de arquivo não suportado. Use xlsx, xls ou csv.")
+            reporter.error("Formato de arquivo não suportado. Use xlsx, xls ou csv.")
             return []
     except Exception as e:
-        st.error(f"Erro ao listar planilhas: {e}")
+        reporter.error(f"Erro ao listar planilhas: {e}")
         return []
\ No newline at end of file
@@ -0,0 +1,105 @@
+import cProfile
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# O tracemalloc é global no processo: só uma execução instrumentada mede a memória por vez
+_tracing_lock = threading.Lock()
+
+# Etapas medidas por process_promotions, na ordem em que rodam
+STAGES = ("load_csv_stream", "load", "prepare", "ean_merge", "filter", "links", "transform", "build", "ean_validation", "export")
+
+class Instrumentation:
+    """
+    Registra tempo de parede, pico de memória (tracemalloc) e linhas de entrada/saída
+    de cada etapa do processamento, por perfil quando aplicável.
+    Opcionalmente grava um dump do cProfile da etapa indicada em profile_stage.
+    """
+
+    def __init__(self, trace_memory=True, profile_stage=None, profile_dir="."):
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        self.profile_dir = profile_dir
+        self.stages = []
+        self.started_tracing = False
+        self.holds_tracing_lock = False
+        self.start_time = None
+        self.total_seconds = None
+
+    def start(self):
+        """
+        Inicia a medição da execução (e o tracemalloc, se ainda não estiver ativo).
+        Com trace_memory, aguarda o fim de outra execução instrumentada no processo.
+        """
+        if self.trace_memory:
+            _tracing_lock.acquire()
+            self.holds_tracing_lock = True
+        self.start_time = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+
+    def finish(self):
+        """Encerra a medição e desliga o tracemalloc se ele foi ligado por esta instância."""
+        if self.start_time is not None:
+            self.total_seconds = round(time.perf_counter() - self.start_time, 4)
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        if self.holds_tracing_lock:
+            self.holds_tracing_lock = False
+            _tracing_lock.release()
+
+    @contextmanager
+    def stage(self, name, rows_in=None, profile=None):
+        """
+        Mede uma etapa; o chamador pode preencher record["rows_out"] dentro do bloco.
+        As etapas não devem ser aninhadas: o pico de memória do tracemalloc é global.
+        """
+        record = {"stage": name, "profile": profile, "rows_in": rows_in, "rows_out": None}
+        profiler = None
+        if self.profile_stage == name:
+            profiler = cProfile.Profile()
+
+        memory_start = 0
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record["seconds"] = round(time.perf_counter() - start, 4)
+            if self.trace_memory and tracemalloc.is_tracing():
+                record["peak_mb"] = round((tracemalloc.get_traced_memory()[1] - memory_start) / 1e6, 2)
+            else:
+                record["peak_mb"] = None
+            if profiler is not None:
+                suffix = f"_{profile.replace('/', '_')}" if profile else ""
+                os.makedirs(self.profile_dir, exist_ok=True)
+                record["cprofile"] = os.path.join(self.profile_dir, f"{name}{suffix}.prof")
+                profiler.dump_stats(record["cprofile"])
+            self.stages.append(record)
+
+    def to_dict(self):
+        """Relatório serializável em JSON."""
+        return {
+            "total_seconds": self.total_seconds,
+            "trace_memory": self.trace_memory,
+            "stages": list(self.stages),
+        }
+
+@contextmanager
+def measure(instrumentation, name, rows_in=None, profile=None):
+    """Mede a etapa se houver instrumentação; caso contrário apenas executa o bloco."""
+    if instrumentation is None:
+        yield {}
+    else:
+        with instrumentation.stage(name, rows_in, profile) as record:
+            yield record
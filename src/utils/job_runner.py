@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from src.utils.reporter import CollectingReporter
+
+# Processamentos executados ao mesmo tempo no servidor (cada um mantém um encarte em memória)
+MAX_CONCURRENT_JOBS = 2
+
+# Processamentos aguardando ou em execução, somados, além dos quais novos envios são recusados
+MAX_PENDING_JOBS = 8
+
+# Tempo (s) que um processamento encerrado fica disponível para a sessão que o enviou;
+# cada sessão mantém só o último (um novo envio descarta os arquivos do anterior)
+FINISHED_JOB_TTL_SECONDS = 3600
+
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_JOBS, thread_name_prefix="promo-job")
+_jobs = {}
+
+# Processamentos exclusivos (instrumentados: o tracemalloc mede e desacelera o processo
+# inteiro) rodam sozinhos; os demais aguardam enquanto um deles roda ou espera a vez
+_slots = threading.Condition()
+_running_jobs = 0
+_exclusive_waiting = 0
+
+class JobCancelled(Exception):
+    """Processamento interrompido a pedido do usuário."""
+
+class JobReporter(CollectingReporter):
+    """Acumula as mensagens de um processamento em segundo plano e a etapa em andamento."""
+
+    def __init__(self):
+        super().__init__()
+        self.stage = "Na fila"
+        self.fraction = 0.0
+        self.cancel_requested = threading.Event()
+
+    def progress(self, stage, fraction):
+        # As etapas são os pontos de interrupção do processamento
+        if self.cancel_requested.is_set():
+            raise JobCancelled()
+        self.stage = stage
+        self.fraction = fraction
+
+class Job:
+    """Processamento enviado ao pool: estado, mensagens, resultado e erro."""
+
+    def __init__(self, session_id, exclusive=False):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.exclusive = exclusive
+        self.status = "queued"
+        self.reporter = JobReporter()
+        self.result = None
+        self.error = None
+        self.future = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    def run(self, func, args, kwargs):
+        if not self.acquire_slot():
+            self.status = "cancelled"
+            self.finished_at = time.time()
+            return
+        self.status = "running"
+        try:
+            self.result = func(*args, reporter=self.reporter, **kwargs)
+            self.reporter.stage, self.reporter.fraction = "Concluído", 1.0
+            self.status = "done"
+        except JobCancelled:
+            self.status = "cancelled"
+        except Exception as e:
+            self.error = e
+            self.status = "failed"
+        finally:
+            self.release_slot()
+            self.finished_at = time.time()
+
+    def acquire_slot(self):
+        """Aguarda a vez de rodar (ver _slots); retorna False se cancelado enquanto aguardava."""
+        global _running_jobs, _exclusive_waiting
+        with _slots:
+            if self.exclusive:
+                _exclusive_waiting += 1
+            try:
+                while not self.reporter.cancel_requested.is_set():
+                    # _running_jobs é -1 enquanto um processamento exclusivo roda
+                    if self.exclusive:
+                        free = _running_jobs == 0
+                    else:
+                        free = _running_jobs >= 0 and not _exclusive_waiting
+                    if free:
+                        _running_jobs = -1 if self.exclusive else _running_jobs + 1
+                        return True
+                    _slots.wait(timeout=0.5)
+                return False
+            finally:
+                if self.exclusive:
+                    _exclusive_waiting -= 1
+
+    def release_slot(self):
+        global _running_jobs
+        with _slots:
+            _running_jobs = 0 if self.exclusive else _running_jobs - 1
+            _slots.notify_all()
+
+    def cancel(self):
+        """Pede a interrupção: imediata se ainda na fila, na próxima etapa se em execução."""
+        self.reporter.cancel_requested.set()
+        if self.future is not None and self.future.cancel():
+            self.status = "cancelled"
+            self.finished_at = time.time()
+
+def snapshot_upload(file):
+    """Copia um arquivo enviado para um BytesIO com o mesmo nome, independente dos reruns da sessão."""
+    if file is None:
+        return None
+    file.seek(0)
+    copy = BytesIO(file.read())
+    copy.name = os.path.basename(file.name)
+    file.seek(0)
+    return copy
+
+def purge_finished_jobs():
+    """Descarta os processamentos encerrados há mais de FINISHED_JOB_TTL_SECONDS."""
+    limit = time.time() - FINISHED_JOB_TTL_SECONDS
+    with _lock:
+        for job_id in [job_id for job_id, job in _jobs.items() if job.finished and job.finished_at < limit]:
+            del _jobs[job_id]
+
+def submit_job(session_id, func, *args, exclusive=False, **kwargs):
+    """
+    Envia func(*args, reporter=..., **kwargs) ao pool de processamentos e retorna o Job.
+    Com exclusive, o processamento roda sozinho (ex.: instrumentado com tracemalloc).
+    Os processamentos encerrados da mesma sessão (e seus arquivos) são descartados.
+    Levanta RuntimeError se a fila do servidor estiver cheia.
+    """
+    purge_finished_jobs()
+    job = Job(session_id, exclusive)
+    with _lock:
+        pending = sum(1 for other in _jobs.values() if not other.finished)
+        if pending >= MAX_PENDING_JOBS:
+            raise RuntimeError("Servidor ocupado: muitos processamentos em andamento. Tente novamente em instantes.")
+        for job_id in [job_id for job_id, other in _jobs.items() if other.session_id == session_id and other.finished]:
+            del _jobs[job_id]
+        _jobs[job.id] = job
+        job.future = _executor.submit(job.run, func, args, kwargs)
+    return job
+
+def get_job(job_id, session_id=None):
+    """Retorna o Job pelo id (opcionalmente apenas se pertencer à sessão), ou None."""
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is None or (session_id is not None and job.session_id != session_id):
+        return None
+    return job
+
+def queue_position(job):
+    """Quantos processamentos enviados antes deste ainda aguardam na fila."""
+    with _lock:
+        queued = [other for other in _jobs.values() if other.status == "queued"]
+    return queued.index(job) if job in queued else 0
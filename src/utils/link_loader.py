@@ -1,25 +1,252 @@
+import hashlib
 import json
-import streamlit as st
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import closing
+import numpy as np
+import pandas as pd
+from src.utils.ean_classifier import split_ean_tokens
+from src.utils.text_utils import normalize_string, map_unique
+from src.utils.reporter import get_reporter
 
-def load_links_json(file):
-    """Carrega um arquivo JSON com links e retorna um dicionário {EAN: URL}"""
-    if not file:
+# Versão do formato do índice compilado; alterar força a recompilação dos sidecars
+LINK_INDEX_VERSION = 2
+UPLOAD_CACHE_SIZE = 8
+
+# Semelhança mínima (Dice sobre trigramas) para aceitar uma URL pelo nome do produto
+NAME_MATCH_THRESHOLD = 0.7
+
+_lock = threading.Lock()
+_repository_cache = {}
+_upload_cache = OrderedDict()
+
+def name_trigrams(name):
+    """Trigramas do nome normalizado (sem acentos, pontuação e espaços repetidos)."""
+    text = f" {' '.join(normalize_string(name).split())} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class LinkIndex:
+    """
+    Repositório de links de imagens: URL por EAN e, como alternativa, por código
+    interno e por nome do produto (índice de trigramas dos nomes normalizados).
+    """
+
+    def __init__(self, eans=None, codes=None, names=None):
+        self.eans = eans or {}
+        self.codes = codes or {}
+        self.names = names or []
+        self.trigrams = None
+        self.trigram_counts = None
+        self.lock = threading.Lock()
+
+    def build_name_index(self):
+        """Monta (uma única vez, sob demanda) a lista de entradas por trigrama dos nomes."""
+        with self.lock:
+            if self.trigrams is not None:
+                return
+            postings = {}
+            counts = np.zeros(len(self.names), dtype=np.int32)
+            for position, (name, _) in enumerate(self.names):
+                grams = name_trigrams(name)
+                counts[position] = len(grams)
+                for gram in grams:
+                    postings.setdefault(gram, []).append(position)
+            self.trigram_counts = counts
+            self.trigrams = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.eans)
+
+    def __bool__(self):
+        return bool(self.eans or self.codes or self.names)
+
+    def match_name(self, name):
+        """Retorna (URL, semelhança) do nome mais parecido acima do limite, ou None."""
+        if self.trigrams is None:
+            self.build_name_index()
+        # A semelhança de um nome só percorre as listas de entradas dos seus trigramas
+        grams = name_trigrams(name)
+        postings = [self.trigrams[gram] for gram in grams if gram in self.trigrams]
+        if not postings:
+            return None
+        common = np.bincount(np.concatenate(postings), minlength=len(self.names))
+        scores = 2 * common / (len(grams) + self.trigram_counts)
+        best = int(scores.argmax())
+        if scores[best] < NAME_MATCH_THRESHOLD:
+            return None
+        return self.names[best][1], float(scores[best])
+
+def parse_links(data):
+    """Converte a lista de produtos do JSON em um LinkIndex (EANs, códigos e nomes)."""
+    ean_to_url = {}
+    code_to_url = {}
+    names = []
+    for item in data:
+        url = item.get("url", "").strip()
+        if not url:
+            continue
+        for ean in item.get("eans", []):
+            ean_to_url[str(ean).strip()] = url
+        for code in item.get("codigo", []):
+            code_to_url[str(code).strip()] = url
+        name = str(item.get("nome") or "").strip()
+        if name:
+            names.append((name, url))
+    return LinkIndex(ean_to_url, code_to_url, names)
+
+def sidecar_path(json_path):
+    """Caminho do índice compilado (SQLite) ao lado do arquivo JSON."""
+    return os.path.splitext(json_path)[0] + ".links.sqlite"
+
+def file_digest(path):
+    """Calcula o SHA-256 do conteúdo do arquivo."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_sidecar_meta(path):
+    """Lê os metadados do índice compilado; retorna {} se ausente ou ilegível."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with closing(sqlite3.connect(path)) as conn:
+            return dict(conn.execute("SELECT key, value FROM meta"))
+    except sqlite3.Error:
         return {}
 
+def read_sidecar_links(path):
+    """Carrega o LinkIndex (EANs, códigos e nomes) do índice compilado."""
+    with closing(sqlite3.connect(path)) as conn:
+        return LinkIndex(
+            dict(conn.execute("SELECT ean, url FROM links")),
+            dict(conn.execute("SELECT codigo, url FROM codes")),
+            list(conn.execute("SELECT nome, url FROM names ORDER BY position"))
+        )
+
+def write_sidecar(path, links, meta):
+    """Grava o índice compilado de forma atômica (arquivo temporário + replace)."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with closing(sqlite3.connect(tmp_path)) as conn, conn:
+            conn.execute("CREATE TABLE links (ean TEXT PRIMARY KEY, url TEXT NOT NULL)")
+            conn.execute("CREATE TABLE codes (codigo TEXT PRIMARY KEY, url TEXT NOT NULL)")
+            conn.execute("CREATE TABLE names (position INTEGER PRIMARY KEY, nome TEXT NOT NULL, url TEXT NOT NULL)")
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.executemany("INSERT INTO links VALUES (?, ?)", links.eans.items())
+            conn.executemany("INSERT INTO codes VALUES (?, ?)", links.codes.items())
+            conn.executemany("INSERT INTO names VALUES (?, ?, ?)", [(i, name, url) for i, (name, url) in enumerate(links.names)])
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def update_sidecar_meta(path, meta):
+    """Atualiza metadados do índice compilado sem reconstruí-lo."""
+    with closing(sqlite3.connect(path)) as conn, conn:
+        conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", meta.items())
+
+def compile_link_repository(json_path):
+    """
+    Retorna o LinkIndex do repositório JSON usando o índice compilado.
+    O sidecar é reconstruído quando o mtime e o hash do JSON mudam.
+    """
+    mtime = str(os.stat(json_path).st_mtime_ns)
+    index_path = sidecar_path(json_path)
+    meta = read_sidecar_meta(index_path)
+
+    if meta.get("version") == str(LINK_INDEX_VERSION):
+        if meta.get("mtime") == mtime:
+            return read_sidecar_links(index_path)
+        digest = file_digest(json_path)
+        if meta.get("sha256") == digest:
+            update_sidecar_meta(index_path, {"mtime": mtime})
+            return read_sidecar_links(index_path)
+    else:
+        digest = file_digest(json_path)
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        links = parse_links(json.load(f))
+    try:
+        write_sidecar(index_path, links, {
+            "version": str(LINK_INDEX_VERSION), "mtime": mtime, "sha256": digest
+        })
+    except (OSError, sqlite3.Error):
+        pass  # Sem permissão de escrita: segue apenas com o índice em memória
+    return links
+
+def load_link_repository(json_path):
+    """Carrega (sob demanda) o repositório de links, compartilhado por todo o processo."""
+    mtime = os.stat(json_path).st_mtime_ns
+    with _lock:
+        cached = _repository_cache.get(json_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        links = compile_link_repository(json_path)
+        _repository_cache[json_path] = (mtime, links)
+        return links
+
+def load_uploaded_links(file):
+    """Carrega um JSON enviado, reaproveitando o índice já montado para o mesmo conteúdo."""
+    file.seek(0)
+    content = file.read()
+    digest = hashlib.sha256(content).hexdigest()
+    with _lock:
+        if digest in _upload_cache:
+            _upload_cache.move_to_end(digest)
+            return _upload_cache[digest]
+        links = parse_links(json.loads(content))
+        _upload_cache[digest] = links
+        while len(_upload_cache) > UPLOAD_CACHE_SIZE:
+            _upload_cache.popitem(last=False)
+        return links
+
+def load_links_json(file, reporter=None):
+    """Carrega um arquivo JSON com links e retorna um LinkIndex"""
+    if not file:
+        return LinkIndex()
+
     try:
         if isinstance(file, str):  # Caso seja o arquivo padrão
-            with open(file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            return load_link_repository(file)
         else:  # Caso seja um arquivo enviado
-            data = json.load(file)
-        ean_to_url = {}
-        for item in data:
-            url = item.get("url", "").strip()
-            if not url:
-                continue
-            for ean in item.get("eans", []):
-                ean_to_url[str(ean).strip()] = url
-        return ean_to_url
+            return load_uploaded_links(file)
     except Exception as e:
-        st.error(f"Erro ao ler arquivo de links: {e}")
-        return {}
\ No newline at end of file
+        get_reporter(reporter).error(f"Erro ao ler arquivo de links: {e}")
+        return LinkIndex()
+
+def resolve_urls(ean_series, link_map):
+    """Retorna, por linha, a URL do primeiro EAN encontrado em link_map ("" se nenhum)."""
+    urls = np.full(len(ean_series), "", dtype=object)
+    if link_map.eans:
+        hits = split_ean_tokens(ean_series).map(link_map.eans).dropna()
+        first_hit = hits.groupby(level=0).first()
+        urls[first_hit.index.to_numpy()] = first_hit.to_numpy()
+    return pd.Series(urls, index=ean_series.index)
+
+def resolve_image_urls(ean_series, code_series, name_series, link_map):
+    """
+    Retorna (URLs, máscara de revisão) por linha: primeiro pelo EAN; na falta, pelo
+    código interno; por último, pelo nome mais parecido (marcado para revisão).
+    """
+    urls = resolve_urls(ean_series, link_map).to_numpy()
+    review = np.zeros(len(urls), dtype=bool)
+
+    if link_map.codes and code_series is not None:
+        missing = urls == ""
+        codes = code_series[missing].astype(str).str.strip().str.replace('-', '', regex=False)
+        hits = codes.map(link_map.codes).fillna("").to_numpy()
+        urls[missing] = hits
+
+    if link_map.names:
+        missing = urls == ""
+        if missing.any():
+            hits = map_unique(name_series[missing], lambda name: (link_map.match_name(name) or ("",))[0]).to_numpy()
+            urls[missing] = hits
+            review[np.flatnonzero(missing)[hits != ""]] = True
+
+    return pd.Series(urls, index=ean_series.index), review
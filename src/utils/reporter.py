@@ -0,0 +1,70 @@
+from abc import ABC, abstractmethod
+
+class Reporter(ABC):
+    """Interface para as mensagens do processamento (erros, avisos e sucessos)."""
+
+    @abstractmethod
+    def error(self, message):
+        pass
+
+    @abstractmethod
+    def warning(self, message):
+        pass
+
+    @abstractmethod
+    def success(self, message):
+        pass
+
+    def progress(self, stage, fraction):
+        """Notifica o início de uma etapa (fraction entre 0 e 1 do processamento); ignorado por padrão."""
+
+class StreamlitReporter(Reporter):
+    """Exibe as mensagens na sessão Streamlit atual."""
+
+    def error(self, message):
+        import streamlit as st
+        st.error(message)
+
+    def warning(self, message):
+        import streamlit as st
+        st.warning(message)
+
+    def success(self, message):
+        import streamlit as st
+        st.success(message)
+
+class CollectingReporter(Reporter):
+    """
+    Acumula as mensagens em memória (execuções headless, workers e relatórios).
+    As etapas (progress) são repassadas a progress_reporter, se informado.
+    """
+
+    def __init__(self, progress_reporter=None):
+        self.messages = []
+        self.progress_reporter = progress_reporter
+
+    def error(self, message):
+        self.messages.append({"level": "error", "message": message})
+
+    def warning(self, message):
+        self.messages.append({"level": "warning", "message": message})
+
+    def success(self, message):
+        self.messages.append({"level": "success", "message": message})
+
+    def progress(self, stage, fraction):
+        if self.progress_reporter is not None:
+            self.progress_reporter.progress(stage, fraction)
+
+    @property
+    def errors(self):
+        return [m["message"] for m in self.messages if m["level"] == "error"]
+
+    def replay(self, reporter):
+        """Reenvia as mensagens acumuladas, na ordem, para outro reporter."""
+        for m in self.messages:
+            getattr(reporter, m["level"])(m["message"])
+
+def get_reporter(reporter=None):
+    """Retorna o reporter informado ou, por padrão, o da interface Streamlit."""
+    return reporter if reporter is not None else StreamlitReporter()
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from src.config.config_loader import CONFIG_PATH, DEFAULT_LINKS_PATH, EAN_STORE_PATH
+
+# Tamanho máximo (bytes dos arquivos gerados) mantido no cache de resultados
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+_lock = threading.Lock()
+_result_cache = OrderedDict()
+_result_cache_bytes = 0
+
+def upload_digest(file):
+    """SHA-256 do conteúdo de um arquivo enviado (None se não houver arquivo)."""
+    if file is None:
+        return None
+    file.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(1 << 20), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+def path_stamp(path):
+    """Identifica a versão de um arquivo do projeto por tamanho e data de modificação."""
+    try:
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+    except OSError:
+        return None
+
+def run_context(link_file, use_default_url, start_date, end_date, use_link_file, apply_name_correction):
+    """Parâmetros que, junto com as linhas do encarte, determinam os arquivos gerados."""
+    use_default_links = bool(use_link_file and use_default_url)
+    use_uploaded_links = bool(use_link_file and not use_default_url and link_file)
+    return {
+        "link_file": upload_digest(link_file) if use_uploaded_links else None,
+        "default_links": path_stamp(DEFAULT_LINKS_PATH) if use_default_links else None,
+        "use_link_file": bool(use_link_file),
+        "config": path_stamp(CONFIG_PATH),
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "name_correction": bool(apply_name_correction),
+    }
+
+def hash_key(data):
+    """SHA-256 de um dicionário serializável em JSON."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+def run_context_key(link_file, use_default_url, start_date, end_date, use_link_file, apply_name_correction):
+    """Chave do contexto de execução (sem os arquivos de encarte e de EANs)."""
+    return hash_key(run_context(link_file, use_default_url, start_date, end_date, use_link_file, apply_name_correction))
+
+def result_cache_key(uploaded_file, ean_file, link_file, use_default_url, start_date, end_date, use_ean_file, use_link_file, apply_name_correction, sheet_name, use_ean_store=False, output_mode="files"):
+    """
+    Chave do resultado: hash do conteúdo dos arquivos usados, dos parâmetros (inclusive o modo de saída) e da
+    versão do config.json, do repositório de links padrão e do repositório local de EANs.
+    """
+    use_ean = bool(use_ean_file and ean_file)
+    key = run_context(link_file, use_default_url, start_date, end_date, use_link_file, apply_name_correction)
+    key.update({
+        "encarte": upload_digest(uploaded_file),
+        "encarte_name": os.path.splitext(uploaded_file.name)[1].lower(),
+        "sheet": sheet_name,
+        "ean_file": upload_digest(ean_file) if use_ean else None,
+        "ean_file_name": os.path.splitext(ean_file.name)[1].lower() if use_ean else None,
+        "ean_store": path_stamp(EAN_STORE_PATH) if use_ean_store and not use_ean else None,
+        "output_mode": output_mode,
+    })
+    return hash_key(key)
+
+def get_cached_result(key):
+    """
+    Retorna (arquivos, mensagens) de uma execução anterior com a mesma chave, ou None.
+    Os arquivos são devolvidos como novos BytesIO, prontos para download.
+    """
+    with _lock:
+        entry = _result_cache.get(key)
+        if entry is None:
+            return None
+        _result_cache.move_to_end(key)
+        files, messages, _ = entry
+    return [(filename, BytesIO(content)) for filename, content in files], list(messages)
+
+def store_result(key, output_files, messages):
+    """Guarda os arquivos gerados e as mensagens, descartando os menos usados acima do limite."""
+    global _result_cache_bytes
+    files = [(filename, output.getvalue()) for filename, output in output_files]
+    size = sum(len(content) for _, content in files)
+    if size > RESULT_CACHE_MAX_BYTES:
+        return
+    with _lock:
+        if key in _result_cache:
+            _result_cache_bytes -= _result_cache.pop(key)[2]
+        _result_cache[key] = (files, list(messages), size)
+        _result_cache_bytes += size
+        while _result_cache_bytes > RESULT_CACHE_MAX_BYTES:
+            _, (_, _, evicted) = _result_cache.popitem(last=False)
+            _result_cache_bytes -= evicted
+
+def clear_result_cache():
+    """Esvazia o cache de resultados."""
+    global _result_cache_bytes
+    with _lock:
+        _result_cache.clear()
+        _result_cache_bytes = 0
@@ -0,0 +1,48 @@
+import pandas as pd
+
+# Colunas de baixa cardinalidade do encarte (poucos valores distintos repetidos em muitas linhas)
+CATEGORY_COLUMNS = ['perfil de loja', 'tipo ação', 'comprador', 'compradora', 'compradores', 'compradoras']
+
+# Colunas de texto livre ou de alta cardinalidade
+STRING_COLUMNS = ['código', 'ean', 'ean_original_encarte', 'descrição do item']
+
+# Preços ficam em float64: float32 alteraria os valores exportados (12.9 → 12.8999996)
+PRICE_COLUMNS = ['preço de:', 'preço por:']
+
+# Colunas do arquivo final com um único valor ou poucos valores distintos
+OUTPUT_CATEGORY_COLUMNS = [
+    "Carrossel", "Check-In", "Unidade", "Não exigir ativação no App", "Ativar em", "Inativar em",
+    "Tipo do código", "Tipo Promocional", "Sobrescrever lojas", "Lojas"
+]
+
+# Colunas iniciadas por "_" são auxiliares: orientam os destaques mas não são gravadas
+HIDDEN_COLUMN_PREFIX = "_"
+URL_REVIEW_COLUMN = "_revisar URL da imagem"
+EAN_ISSUE_COLUMN = "_problema no EAN"
+
+def arrow_string_dtype():
+    """Tipo de texto compacto: string com Arrow."""
+    return pd.StringDtype("pyarrow")
+
+def working_schema(df):
+    """Retorna {coluna: dtype} do esquema de trabalho para as colunas presentes em df."""
+    string_dtype = arrow_string_dtype()
+    schema = {}
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            schema[col] = "category"
+    for col in STRING_COLUMNS:
+        if col in df.columns:
+            schema[col] = string_dtype
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            schema[col] = "float64"
+    return schema
+
+def apply_working_schema(df):
+    """Converte o DataFrame de trabalho (linhas CRM) para tipos compactos em uma única cópia."""
+    return df.astype(working_schema(df))
+
+def apply_output_schema(df_final):
+    """Converte as colunas de valores repetidos do arquivo final em categorias."""
+    return df_final.astype({col: "category" for col in OUTPUT_CATEGORY_COLUMNS if col in df_final.columns})
@@ -1,31 +1,38 @@
 import string
 import unicodedata
 import re
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 
 translator = str.maketrans('', '', string.punctuation)
 
-def normalize_text(text):
-    """Normaliza texto: lowercase, remove acentos e pontuação."""
-    if pd.isna(text):
-        return ""
-    text = str(text).strip().lower()
+# Tamanho dos caches de normalização (valores distintos mantidos entre execuções)
+TEXT_CACHE_SIZE = 65536
+
+SUFFIX_KEYWORDS = ["sell out", "sell in", "faturamento"]
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def normalize_string(text):
+    """Versão memorizada de normalize_text para valores já convertidos em str."""
+    text = text.strip().lower()
     text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('utf-8')
     text = text.translate(translator)
     return text
 
-def remove_suffix(text):
-    """Remove sufixos como _sell out, _faturamento e tudo que vier depois."""
+def normalize_text(text):
+    """Normaliza texto: lowercase, remove acentos e pontuação."""
     if pd.isna(text):
         return ""
+    return normalize_string(str(text))
 
-    raw = str(text)
-    norm = normalize_text(raw)
-
-    keywords = ["sell out", "sell in", "faturamento"]
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def remove_suffix_string(raw):
+    """Versão memorizada de remove_suffix para valores já convertidos em str."""
+    norm = normalize_string(raw)
 
     # Procura onde aparece o sufixo
-    for kw in keywords:
+    for kw in SUFFIX_KEYWORDS:
         pos = norm.find(kw)
         if pos != -1:
             # Posição equivalente no texto original
@@ -36,11 +43,100 @@ def remove_suffix(text):
 
     return raw.strip()
 
+def remove_suffix(text):
+    """Remove sufixos como _sell out, _faturamento e tudo que vier depois."""
+    if pd.isna(text):
+        return ""
+    return remove_suffix_string(str(text))
+
+def map_unique(series, func, na_value=""):
+    """Aplica func apenas aos valores distintos da coluna e replica o resultado nas linhas."""
+    codes, uniques = pd.factorize(series)
+    # O código -1 (nulo) aponta para o último elemento: na_value
+    results = np.array([func(value) for value in uniques] + [na_value], dtype=object)
+    return pd.Series(results[codes], index=series.index)
+
+def normalize_series(series):
+    """Aplica normalize_text a uma coluna inteira, processando só os valores distintos."""
+    return map_unique(series, normalize_text)
+
+def remove_suffix_series(series):
+    """Aplica remove_suffix a uma coluna inteira, processando só os valores distintos."""
+    return map_unique(series, remove_suffix)
+
+class ProductNameCorrector:
+    """
+    Motor de correção de nomes compilado uma única vez a partir de product_name_corrections.
+    Uma alternância com todos os padrões descarta de uma vez os nomes sem nenhuma
+    ocorrência; os demais recebem as substituições na ordem do dicionário.
+    """
+
+    def __init__(self, corrections_dict):
+        self.patterns = [
+            (re.compile(pattern, flags=re.IGNORECASE), replacement)
+            for pattern, replacement in corrections_dict.items()
+        ]
+        self.any_pattern = None
+        # Grupos numerados mudariam de sentido dentro da alternância combinada
+        if self.patterns and all(pattern.groups == 0 for pattern, _ in self.patterns):
+            try:
+                self.any_pattern = re.compile(
+                    "|".join(f"(?:{pattern.pattern})" for pattern, _ in self.patterns),
+                    flags=re.IGNORECASE
+                )
+            except re.error:
+                self.any_pattern = None
+
+    def correct(self, name):
+        """Corrige um nome, retornando em maiúsculo ("" para valores nulos)."""
+        if pd.isna(name):
+            return ""
+        corrected_name = str(name).strip()
+        if self.any_pattern is not None and not self.any_pattern.search(corrected_name):
+            return corrected_name.upper()
+        for pattern, replacement in self.patterns:
+            corrected_name = pattern.sub(replacement, corrected_name)
+        return corrected_name.upper()
+
+    def correct_series(self, series):
+        """Corrige uma coluna processando apenas os valores distintos."""
+        return map_unique(series, self.correct)
+
+@lru_cache(maxsize=8)
+def compile_product_name_corrections(corrections_items):
+    """Compila (e guarda) o motor de correção para os pares (padrão, substituição)."""
+    return ProductNameCorrector(dict(corrections_items))
+
 def correct_product_name(name, corrections_dict):
     """Corrige o nome do produto com base no dicionário de correções, retornando em maiúsculo."""
-    if pd.isna(name):
-        return ""
-    corrected_name = str(name).strip()
-    for pattern, replacement in corrections_dict.items():
-        corrected_name = re.sub(pattern, replacement, corrected_name, flags=re.IGNORECASE)
-    return corrected_name.upper()
\ No newline at end of file
+    return compile_product_name_corrections(tuple(corrections_dict.items())).correct(name)
+
+class BuyerCarrosselMatcher:
+    """
+    Associa o comprador normalizado ao carrossel usando uma única regex compilada
+    a partir de buyer_carrossel_map. Mantém a regra original: vence a primeira
+    chave (na ordem do dicionário) contida no texto do comprador.
+    """
+
+    def __init__(self, mapping):
+        self.keys = list(mapping)
+        self.values = list(mapping.values())
+        self.key_order = {key: position for position, key in enumerate(self.keys)}
+        # Lookahead permite ocorrências sobrepostas; em cada posição a alternância
+        # devolve a chave de menor ordem que casa ali
+        self.pattern = None
+        if self.keys:
+            self.pattern = re.compile("(?=(" + "|".join(map(re.escape, self.keys)) + "))")
+
+    def match(self, normalized_buyer):
+        """Retorna o valor do carrossel se alguma chave estiver contida no texto do comprador."""
+        if not normalized_buyer or self.pattern is None:
+            return ''
+        found = {m.group(1) for m in self.pattern.finditer(normalized_buyer)}
+        if not found:
+            return ''
+        return self.values[min(self.key_order[key] for key in found)]
+
+    def match_series(self, series):
+        """Aplica match apenas aos compradores distintos da coluna."""
+        return map_unique(series, self.match)
@@ -0,0 +1,51 @@
+"""
+process_promotions_cached repassa as etapas ao reporter de quem chama: o
+progresso e o cancelamento dos processamentos em segundo plano dependem disso.
+"""
+from datetime import date
+
+import pytest
+
+from benchmarks.generate_encarte import generate
+from src.processors.promotion_processor import process_promotions_cached
+from src.utils.data_utils import encarte_period
+from src.utils.job_runner import JobReporter, JobCancelled
+
+class RecordingReporter(JobReporter):
+    """JobReporter que guarda todas as etapas notificadas."""
+
+    def __init__(self):
+        super().__init__()
+        self.stages = []
+
+    def progress(self, stage, fraction):
+        self.stages.append((stage, fraction))
+        super().progress(stage, fraction)
+
+def run_cached(path, reporter):
+    start_dt, end_dt = encarte_period(date(2026, 10, 1), date(2026, 10, 7))
+    with open(path, "rb") as uploaded_file:
+        return process_promotions_cached(
+            uploaded_file, None, None, False, start_dt, end_dt, False, False, False, None, reporter=reporter
+        )
+
+def make_encarte(tmp_path, rows):
+    # Tamanho diferente por teste: o conteúdo muda e o cache de resultados não é reaproveitado
+    paths, _ = generate(rows, ["csv"], str(tmp_path))
+    return paths["csv"]
+
+def test_cached_run_reports_progress(tmp_path):
+    reporter = RecordingReporter()
+    output_files, from_cache = run_cached(make_encarte(tmp_path, 150), reporter)
+    assert not from_cache and output_files
+    stages = [stage for stage, _ in reporter.stages]
+    assert stages[0] == "Carregando configurações"
+    assert "Gerando perfil GERAL" in stages
+    fractions = [fraction for _, fraction in reporter.stages]
+    assert fractions == sorted(fractions)
+
+def test_cached_run_can_be_cancelled(tmp_path):
+    reporter = RecordingReporter()
+    reporter.cancel_requested.set()
+    with pytest.raises(JobCancelled):
+        run_cached(make_encarte(tmp_path, 160), reporter)
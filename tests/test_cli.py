@@ -0,0 +1,40 @@
+"""
+Execução de ponta a ponta do cli.py em um processo separado: o processo precisa
+terminar (inclusive com o pool de perfis em uso) e gravar o relatório.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.generate_encarte import generate
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# os.cpu_count é trocado para que o pool de perfis seja usado mesmo em máquinas com uma CPU
+RUN_CLI = """
+import os, sys
+os.cpu_count = lambda: 4
+import cli
+sys.exit(cli.main(sys.argv[1:]))
+"""
+
+def run_cli(*args):
+    return subprocess.run(
+        [sys.executable, "-c", RUN_CLI, *args], cwd=ROOT, capture_output=True, text=True, timeout=120
+    )
+
+def test_single_file_run_exits_and_writes_report(tmp_path):
+    paths, _ = generate(300, ["xlsx"], str(tmp_path / "in"))
+    output_dir = tmp_path / "out"
+    completed = run_cli(
+        paths["xlsx"], "--start", "01/10/2026", "--end", "07/10/2026",
+        "--output-dir", str(output_dir), "--workers", "1"
+    )
+    assert completed.returncode == 0, completed.stderr
+    with open(output_dir / "run_report.json", encoding="utf-8") as f:
+        report = json.load(f)
+    [entry] = report["files"]
+    assert entry["status"] == "ok"
+    assert len(entry["outputs"]) == 3
+    assert all(os.path.exists(path) for path in entry["outputs"])
@@ -0,0 +1,96 @@
+"""
+Equivalência de copy_price_from_previous_row com o loop linha a linha original
+(iloc), em DataFrames aleatórios com semente fixa.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.data_utils import copy_price_from_previous_row
+
+PRICE_COLUMNS = {"preço de:": "copied_preço_de", "preço por:": "copied_preço_por"}
+
+def reference_copy_prices(df_base):
+    """Loop original de promotion_processor, usado como referência."""
+    df_base = df_base.copy()
+    df_base["copied_preço_de"] = False
+    df_base["copied_preço_por"] = False
+    for i in range(len(df_base)):
+        for col, flag_col in PRICE_COLUMNS.items():
+            if pd.isna(df_base.iloc[i][col]) and i > 0:
+                current_ean = str(df_base.iloc[i]["ean"]) if not pd.isna(df_base.iloc[i]["ean"]) else ""
+                prev_ean = str(df_base.iloc[i-1]["ean"]) if not pd.isna(df_base.iloc[i-1]["ean"]) else ""
+                if current_ean[:7] == prev_ean[:7] and not pd.isna(df_base.iloc[i-1][col]):
+                    df_base.iloc[i, df_base.columns.get_loc(col)] = df_base.iloc[i-1][col]
+                    df_base.iloc[i, df_base.columns.get_loc(flag_col)] = True
+    return df_base
+
+def copy_prices(df, previous_row=None):
+    """Aplica copy_price_from_previous_row às duas colunas de preço, como prepare_base_frame."""
+    df = df.copy()
+    for col, flag_col in PRICE_COLUMNS.items():
+        df = copy_price_from_previous_row(df, col, flag_col, previous_row=previous_row)
+    return df
+
+def random_frame(seed, rows=300):
+    """Preços com muitos vazios e EANs com prefixos repetidos, curtos, vazios ou NaN."""
+    rng = np.random.default_rng(seed)
+    prefixes = ["7891000", "7891001", "7896", ""]
+    eans = []
+    for _ in range(rows):
+        kind = rng.integers(10)
+        if kind == 0:
+            eans.append(np.nan)
+        elif kind == 1:
+            eans.append(str(rng.integers(100, 99999)))
+        else:
+            eans.append(prefixes[rng.integers(len(prefixes))] + str(rng.integers(100000, 999999)))
+    df = pd.DataFrame({"ean": pd.Series(eans, dtype=object)})
+    for col in PRICE_COLUMNS:
+        prices = rng.integers(100, 10000, rows) / 100
+        df[col] = np.where(rng.random(rows) < 0.5, np.nan, prices)
+    return df
+
+def assert_same_prices(result, expected):
+    for col, flag_col in PRICE_COLUMNS.items():
+        pd.testing.assert_series_equal(result[col], expected[col], check_names=False)
+        assert result[flag_col].astype(bool).tolist() == expected[flag_col].tolist()
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_reference_loop(seed):
+    df = random_frame(seed)
+    assert_same_prices(copy_prices(df), reference_copy_prices(df))
+
+def test_first_row_is_never_copied():
+    df = pd.DataFrame({"ean": ["7891000111111", "7891000222222"], "preço de:": [np.nan, np.nan], "preço por:": [np.nan, 5.0]})
+    result = copy_prices(df)
+    assert result["preço de:"].isna().all()
+    assert not result["copied_preço_de"].any()
+    assert not result["copied_preço_por"].any()
+
+def test_copies_propagate_and_stop_at_prefix_change():
+    df = pd.DataFrame({
+        "ean": ["7891000111111", "7891000222222", "7891000333333", "7896000444444", np.nan, np.nan],
+        "preço de:": [10.0, np.nan, np.nan, np.nan, 3.0, np.nan],
+        "preço por:": [9.0, np.nan, 8.0, np.nan, np.nan, np.nan],
+    })
+    result = copy_prices(df)
+    assert result["preço de:"].tolist()[:3] == [10.0, 10.0, 10.0]
+    assert pd.isna(result["preço de:"].iloc[3])
+    # EANs NaN têm o mesmo prefixo (vazio) entre si
+    assert result["preço de:"].iloc[5] == 3.0
+    assert result["copied_preço_de"].tolist() == [False, True, True, False, False, True]
+    assert result["preço por:"].tolist()[:3] == [9.0, 9.0, 8.0]
+    assert result["copied_preço_por"].tolist() == [False, True, False, False, False, False]
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("chunk_size", [1, 7, 64])
+def test_chunks_continue_from_previous_row(seed, chunk_size):
+    df = random_frame(seed, rows=200)
+    expected = reference_copy_prices(df)
+    parts, previous_row = [], None
+    for start in range(0, len(df), chunk_size):
+        part = copy_prices(df.iloc[start:start + chunk_size], previous_row=previous_row)
+        parts.append(part)
+        previous_row = part.iloc[-1]
+    assert_same_prices(pd.concat(parts), expected)
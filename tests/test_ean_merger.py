@@ -0,0 +1,29 @@
+"""
+merge_ean_index: EANs do mestre primeiro, na ordem do arquivo, sem repetições dentro da linha.
+"""
+import numpy as np
+import pandas as pd
+
+from src.processors.ean_merger import build_ean_index, merge_ean_index
+
+MASTER = pd.DataFrame({
+    'código': ['100', '100', '200', '300'],
+    'ean': ['111/222', '333', '444', None],
+})
+
+def merge(codes, eans):
+    df = pd.DataFrame({'código': codes, 'ean': eans})
+    return merge_ean_index(df, build_ean_index(MASTER))
+
+def test_index_keeps_master_order_and_skips_codes_without_ean():
+    index = build_ean_index(MASTER)
+    assert index.to_dict('list') == {'código': ['100', '100', '100', '200'], 'ean': ['111', '222', '333', '444']}
+
+def test_master_eans_come_first_without_repetitions():
+    df = merge(['100', '2-00'], ['333/999', '444; 555'])
+    assert df['ean'].tolist() == ['111;222;333;999', '444;555']
+    assert df['código'].tolist() == ['100', '200']
+
+def test_codes_outside_the_master_keep_their_own_eans():
+    df = merge(['300', '900', '900'], ['777', '888/888', np.nan])
+    assert df['ean'].tolist() == ['777', '888', '']
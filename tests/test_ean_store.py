@@ -0,0 +1,23 @@
+"""
+import_ean_master: cada importação é o mestre completo (códigos ausentes saem do repositório).
+"""
+from io import BytesIO
+
+from src.processors.ean_store import import_ean_master, lookup_ean_index, ean_store_info
+
+def master_csv(rows):
+    data = BytesIO(("CÓDIGO PRODUTO;CÓDIGO EAN\n" + "".join(f"{code};{ean}\n" for code, ean in rows)).encode())
+    data.name = "mestre.csv"
+    return data
+
+def test_reimport_updates_and_removes_codes(tmp_path):
+    store = str(tmp_path / "eans.sqlite")
+    first = import_ean_master(master_csv([(100, "111"), (200, "222/333"), (300, "444")]), store)
+    assert first == {"inserted": 3, "updated": 0, "unchanged": 0, "removed": 0, "total": 3}
+
+    second = import_ean_master(master_csv([(100, "111"), (200, "555"), (400, "666")]), store)
+    assert second == {"inserted": 1, "updated": 1, "unchanged": 1, "removed": 1, "total": 3}
+    assert ean_store_info(store)["codes"] == 3
+
+    index = lookup_ean_index(["100", "200", "300", "400"], store)
+    assert index.to_dict("list") == {"código": ["100", "200", "400"], "ean": ["111", "555", "666"]}
@@ -0,0 +1,63 @@
+"""
+validate_ean_series: dígito verificador, códigos convertidos em data pelo Excel e EANs repetidos.
+"""
+import pandas as pd
+import pytest
+
+from src.utils.ean_validator import MIN_GTIN_LENGTH, gtin_check_digit_valid, validate_ean_series
+
+def flags_of(values):
+    """(flags por linha, resumo) de uma lista de células de EAN."""
+    return validate_ean_series(pd.Series(values))
+
+@pytest.mark.parametrize("code", [
+    "4006381333931",   # GTIN-13
+    "036000291452",    # GTIN-12 (UPC-A)
+    "10012345678902",  # GTIN-14
+    "73513537",        # GTIN-8
+])
+def test_check_digit_of_valid_gtins(code):
+    assert gtin_check_digit_valid([code]).tolist() == [True]
+
+def test_check_digit_of_invalid_gtin():
+    assert gtin_check_digit_valid(["4006381333932", "036000291453"]).tolist() == [False, False]
+    assert gtin_check_digit_valid([]).tolist() == []
+
+def test_invalid_check_digit_is_flagged():
+    flags, summary = flags_of(["4006381333931", "4006381333932", "036000291452"])
+    assert flags["invalid"].tolist() == [False, True, False]
+    assert summary["invalid"] == 1
+
+def test_long_codes_outside_gtin_lengths_are_invalid():
+    flags, _ = flags_of(["1234567890", "12345678901234567"])
+    assert flags["invalid"].tolist() == [True, True]
+
+def test_short_codes_are_not_checked():
+    # GTIN-8 fica abaixo de MIN_GTIN_LENGTH: é tratado como código interno, mesmo com dígito errado
+    assert MIN_GTIN_LENGTH > 8
+    flags, summary = flags_of(["73513538", "12345", " 987 "])
+    assert not flags["invalid"].any()
+    assert summary["invalid"] == 0
+
+def test_date_mangled_codes_are_flagged_but_not_invalid():
+    flags, summary = flags_of(["2024-5", "2023-12", "4006381333931"])
+    assert flags["date_mangled"].tolist() == [True, True, False]
+    assert not flags["invalid"].any()
+    assert summary["date_mangled"] == 2
+
+def test_duplicates_within_the_profile():
+    flags, summary = flags_of([
+        "4006381333931",
+        "036000291452/036000291452",
+        "10012345678902; 4006381333931",
+        "73513537",
+        None,
+    ])
+    assert flags["duplicate"].tolist() == [True, True, True, False, False]
+    # Cada código repetido conta uma vez no resumo
+    assert summary["duplicate"] == 2
+
+def test_flags_keep_the_series_index():
+    flags, _ = validate_ean_series(pd.Series(["4006381333932", ""], index=[10, 20]))
+    assert flags.index.tolist() == [10, 20]
+    assert flags.loc[10, "invalid"] and not flags.loc[20].any()
@@ -0,0 +1,84 @@
+"""
+Conformidade de ProductNameCorrector com a aplicação sequencial de re.sub
+(um padrão por vez, na ordem do dicionário).
+"""
+import json
+import os
+import random
+import re
+
+import pandas as pd
+import pytest
+
+from src.utils.text_utils import ProductNameCorrector
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "config.json")
+
+FILLER_WORDS = ["500G", "1KG", "LT", "PCT", "UN", "INTEGRAL", "ZERO", "TRAD", "CX", "2L", "C/12"]
+
+# Padrões sobrepostos: cada substituição cria o texto procurado pelo padrão seguinte
+OVERLAPPING_CORRECTIONS = {
+    r"\bsab\b": "SABONETE",
+    r"\bsabonete\b": "SABONETE LIQUIDO",
+    r"\bliq\b": "LIQUIDO",
+    r"\bliquido liquido\b": "LIQUIDO",
+}
+
+# Com grupos de captura o motor não usa a alternância combinada
+GROUP_CORRECTIONS = {
+    r"\b(\d+)\s*gr?\b": r"\1G",
+    r"\bcafe\b": "CAFÉ",
+    r"\b(\d+)\s*ml\b": r"\1ML",
+}
+
+def reference_correction(name, corrections_dict):
+    """Implementação sequencial original, usada como referência."""
+    if pd.isna(name):
+        return ""
+    corrected_name = str(name).strip()
+    for pattern, replacement in corrections_dict.items():
+        corrected_name = re.sub(pattern, replacement, corrected_name, flags=re.IGNORECASE)
+    return corrected_name.upper()
+
+def shipped_corrections():
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)["product_name_corrections"]
+
+def make_names(corrections_dict, count, seed):
+    """Nomes que combinam palavras comuns com os textos dos padrões e das substituições."""
+    rng = random.Random(seed)
+    words = [re.sub(r"\\[bB]|[()?*+]|\\s|\\d", "", pattern) for pattern in corrections_dict]
+    words += [replacement.lower() for replacement in corrections_dict.values()]
+    words += ["12 g", "300gr", "500 ml"]
+    names = []
+    for _ in range(count):
+        parts = rng.sample(FILLER_WORDS, 2)
+        for _ in range(rng.randint(0, 3)):
+            parts.insert(rng.randint(0, len(parts)), rng.choice(words))
+        name = " ".join(parts)
+        names.append(name.upper() if rng.random() < 0.5 else f"  {name} ")
+    return pd.Series(names + [None, float("nan"), ""], dtype=object)
+
+@pytest.mark.parametrize("corrections", [shipped_corrections(), OVERLAPPING_CORRECTIONS, GROUP_CORRECTIONS],
+                         ids=["config", "overlapping", "groups"])
+def test_correct_series_matches_sequential_re_sub(corrections):
+    names = make_names(corrections, 2000, seed=len(corrections))
+    expected = [reference_correction(name, corrections) for name in names]
+    assert ProductNameCorrector(corrections).correct_series(names).tolist() == expected
+
+def test_overlapping_patterns_apply_first_to_last():
+    corrector = ProductNameCorrector(OVERLAPPING_CORRECTIONS)
+    assert corrector.any_pattern is not None
+    # sab -> SABONETE -> SABONETE LIQUIDO; liq -> LIQUIDO; LIQUIDO LIQUIDO -> LIQUIDO
+    assert corrector.correct("sab liq 500g") == "SABONETE LIQUIDO 500G"
+    assert corrector.correct("sab") == "SABONETE LIQUIDO"
+    # Ordem invertida: os padrões anteriores não veem o resultado dos seguintes
+    reversed_corrector = ProductNameCorrector(dict(reversed(list(OVERLAPPING_CORRECTIONS.items()))))
+    assert reversed_corrector.correct("sab") == "SABONETE"
+    assert reversed_corrector.correct("sab liq") == "SABONETE LIQUIDO"
+
+def test_capture_groups_fall_back_to_sequential_patterns():
+    corrector = ProductNameCorrector(GROUP_CORRECTIONS)
+    assert corrector.any_pattern is None
+    assert corrector.correct("cafe 500 gr") == "CAFÉ 500G"
+    assert corrector.correct("shampoo 300 ml") == "SHAMPOO 300ML"
@@ -0,0 +1,87 @@
+"""
+Leitura de preços (parse_price_series): formatos documentados, células vazias e
+máscara das células preenchidas que não puderam ser lidas, inclusive na cópia de
+preços da linha anterior (prepare_base_frame).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.processors.promotion_processor import prepare_base_frame
+from src.utils.data_utils import parse_price_series
+
+def parse(values):
+    prices, failed = parse_price_series(pd.Series(values, dtype=object))
+    return prices.tolist(), failed.tolist()
+
+@pytest.mark.parametrize("text, expected", [
+    ("R$ 1.299,90", 1299.90),
+    ("1,299.90", 1299.90),
+    ("12,90", 12.90),
+    ("12.90", 12.90),
+    ("R$ 12,90", 12.90),
+    ("R$\xa01.299,90", 1299.90),
+    ("1 299,90", 1299.90),
+    ("r$12,90 ", 12.90),
+    ("1.234.567,89", 1234567.89),
+    ("1,234,567.89", 1234567.89),
+    ("1.299.999", 1299999.0),
+    ("-1.299,90", -1299.90),
+    ("R$ 1.299", 1299.0),
+    ("12.900", 12900.0),
+    ("1,299", 1.299),
+    ("0.299", 0.299),
+    ("12.9", 12.9),
+])
+def test_documented_formats(text, expected):
+    prices, failed = parse([text])
+    assert prices[0] == pytest.approx(expected)
+    assert failed == [False]
+
+@pytest.mark.parametrize("text", ["1,2,3", "1.2.3", "1.2,50", "1,2.50", "12.34,5.6", "1.2345,67", "abc", "12,90 reais"])
+def test_malformed_values_fail(text):
+    prices, failed = parse([text])
+    assert np.isnan(prices[0])
+    assert failed == [True]
+
+def test_blank_cells_are_not_failures():
+    prices, failed = parse(["", "  ", "R$", "nan", None, np.nan])
+    assert all(np.isnan(prices))
+    assert not any(failed)
+
+def test_numbers_mixed_with_text():
+    prices, failed = parse([12.9, 3, "R$ 4,50", 1, None])
+    assert prices[:4] == [12.9, 3.0, 4.5, 1.0]
+    assert np.isnan(prices[4])
+    assert failed == [False] * 5
+
+def test_booleans_fail_instead_of_matching_one_and_zero():
+    prices, failed = parse([True, 1, False, 0, "1,00"])
+    assert np.isnan(prices[0]) and np.isnan(prices[2])
+    assert prices[1] == 1.0 and prices[3] == 0.0 and prices[4] == 1.0
+    assert failed == [True, False, True, False, False]
+
+def test_numeric_column_keeps_values_and_index():
+    series = pd.Series([1.5, np.nan, 2], index=[10, 11, 12])
+    prices, failed = parse_price_series(series)
+    assert prices.index.tolist() == [10, 11, 12]
+    assert prices.iloc[0] == 1.5 and np.isnan(prices.iloc[1]) and prices.iloc[2] == 2.0
+    assert not failed.any()
+
+def test_unreadable_price_stops_the_copy_from_previous_rows():
+    df = pd.DataFrame({
+        "código": ["1", "2", "3", "4"],
+        "ean": ["7891000111111", "7891000222222", "7891000333333", "7891000444444"],
+        "preço de:": ["R$ 10,00", "abc", None, "R$ 5,00"],
+        "preço por:": ["R$ 9,00", None, "xyz", None],
+    })
+    df_base = prepare_base_frame(df)
+    # A linha acima da terceira não tem preço legível: nada é copiado de duas linhas acima
+    assert df_base["preço de:"].iloc[0] == 10.0
+    assert df_base["preço de:"].iloc[1:3].isna().all()
+    assert df_base["copied_preço_de"].tolist() == [False, False, False, False]
+    assert df_base["invalid_preço_de"].iloc[1] == "abc"
+    # A cópia para a segunda linha continua valendo; a terceira (ilegível) interrompe a sequência
+    assert df_base["preço por:"].iloc[1] == 9.0
+    assert df_base["preço por:"].iloc[2:].isna().all()
+    assert df_base["copied_preço_por"].tolist() == [False, True, False, False]